@@ -0,0 +1,5 @@
+import sys, os
+benchdir = os.path.dirname(__file__)
+projdir = os.path.dirname(benchdir)
+srcdir = os.path.join(projdir, "src")
+sys.path.insert(0, srcdir)
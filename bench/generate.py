@@ -0,0 +1,114 @@
+"""write a synthetic library of tagged .mp3/.flac files and .m3u playlists.
+
+    python3 -m bench.generate --size 10000 /tmp/aulos_bench
+"""
+import os
+import struct
+import random
+import argparse
+
+from mutagen.easyid3 import EasyID3
+from mutagen.flac import FLAC
+
+tracks_per_album = 10
+albums_per_artist = 4
+tracks_per_playlist = 100
+genres = ('Rock', 'Jazz', 'Electronic', 'Folk', 'Hip-Hop', 'Classical',
+          'Ambient', 'Pop', 'Metal', 'Blues')
+words = ('night', 'blue', 'river', 'Östra', 'signal', 'glass', 'ember',
+         'café', 'north', 'static', 'hollow', 'summer', 'wire', 'echo')
+
+# a bare flac stream header: 44.1kHz, 2 channels, 16 bit
+_stream_info = struct.pack('>HH', 4096, 4096) + b'\x00' * 6
+_stream_info += (44100 << 44 | 1 << 41 | 15 << 36).to_bytes(8, 'big')
+_stream_info += b'\x00' * 16
+_flac_header = b'fLaC' + bytes([0x80, 0, 0, len(_stream_info)]) + _stream_info
+# stands in for audio so files have a plausible size on disk
+_audio_padding = b'\x00' * 4096
+
+
+def _title(rand: random.Random) -> str:
+    return ' '.join(rand.choice(words) for _ in range(rand.randint(1, 4)))
+
+
+def write_mp3(path: str, tags: dict):
+    with open(path, 'wb') as mp3:
+        mp3.write(_audio_padding)
+    id3 = EasyID3()
+    for key, value in tags.items():
+        id3[key] = value
+    id3.save(path)
+
+
+def write_flac(path: str, tags: dict):
+    with open(path, 'wb') as flac_file:
+        flac_file.write(_flac_header)
+        flac_file.write(_audio_padding)
+    flac = FLAC(path)
+    flac.add_tags()
+    for key, value in tags.items():
+        flac.tags[key] = value
+    flac.save()
+
+
+def generate(root: str, size: int, flac_ratio: float = 0.2, seed: int = 0):
+    """write size tracks under root/music, and playlists under
+    root/playlists. returns the two directories."""
+    rand = random.Random(seed)
+    music_dir = os.path.join(root, 'music')
+    playlist_dir = os.path.join(root, 'playlists')
+    os.makedirs(playlist_dir, exist_ok=True)
+
+    tracks = list()
+    for track_num in range(size):
+        album_num = track_num // tracks_per_album
+        artist_num = album_num // albums_per_artist
+        artist = 'Artist %d %s' % (artist_num, rand.choice(words))
+        album = 'Album %d' % album_num
+        album_dir = os.path.join(music_dir, 'Artist %d' % artist_num, album)
+        os.makedirs(album_dir, exist_ok=True)
+
+        number = track_num % tracks_per_album + 1
+        title = _title(rand)
+        tags = {
+            'title': title,
+            'artist': artist,
+            'album': album,
+            'date': str(1960 + album_num % 60),
+            'genre': genres[artist_num % len(genres)],
+            'tracknumber': '%d/%d' % (number, tracks_per_album)
+        }
+        is_flac = rand.random() < flac_ratio
+        ext = '.flac' if is_flac else '.mp3'
+        path = os.path.join(album_dir, '%02d %s%s' % (number, title, ext))
+        if is_flac:
+            write_flac(path, tags)
+        else:
+            write_mp3(path, tags)
+        tracks.append((path, title, artist))
+
+    for playlist_num in range(max(1, size // tracks_per_playlist)):
+        playlist_path = os.path.join(playlist_dir, 'mix %d.m3u' % playlist_num)
+        chosen = rand.sample(tracks, min(tracks_per_playlist, len(tracks)))
+        with open(playlist_path, 'w', encoding='utf-8') as playlist:
+            playlist.write('#EXTM3U\n')
+            for path, title, artist in chosen:
+                duration = rand.randint(60, 600)
+                playlist.write('#EXTINF:%d,%s - %s\n' % (duration, artist, title))
+                playlist.write(os.path.relpath(path, playlist_dir) + '\n')
+    return music_dir, playlist_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root', help='directory to write the library into')
+    parser.add_argument('--size', type=int, default=1000,
+                        help='number of tracks, e.g. 1000, 10000, 100000')
+    parser.add_argument('--flac-ratio', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.root, args.size, args.flac_ratio, args.seed)
+
+
+if __name__ == '__main__':
+    main()
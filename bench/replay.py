@@ -0,0 +1,151 @@
+"""replay scripted keypresses into a running controller, headless, and time
+each one from the key event until the frame that shows it.
+
+    python3 -m bench.replay --sizes 1000 10000
+
+keys are fed in on a driver thread, as the pynput listener would, while the
+controller's own loop draws frames on the ui thread. each key waits for its
+frame before the next is pressed.
+"""
+import os
+import argparse
+import tempfile
+import threading
+from time import perf_counter
+
+from bench import run
+# imported after bench.run has installed the stand-ins
+from controller import Controller, HomeOptions  # noqa: E402
+from pynput.keyboard import Key, KeyCode  # noqa: E402
+
+# how long to wait for a frame before giving up on the controller
+frame_timeout = 5.0
+
+
+def _chars(text: str) -> list:
+    return [KeyCode.from_char(char) for char in text]
+
+
+def get_script(scrolls: int = 100) -> list:
+    """a session starting at the home menu, as (kind, key) pairs"""
+    script = list()
+    # home -> tracks
+    script += [('navigation', Key.down)] * HomeOptions.TRACKS
+    script += [('selection', Key.right)]
+    # browse the track list
+    script += [('navigation', Key.down)] * scrolls
+    script += [('navigation', Key.up)] * (scrolls // 2)
+    script += [('navigation', Key.page_down)] * 20
+    script += [('navigation', Key.page_up)] * 10
+    script += [('navigation', Key.end), ('navigation', Key.home)]
+    script += [('navigation', key) for key in _chars('SNOTW')]
+    # open and close a track's options, then play it
+    script += [('selection', Key.right), ('selection', Key.left)] * 10
+    script += [('selection', Key.right), ('selection', Key.right)]
+    script += [('playback', key) for key in _chars('apnl') * 10]
+    # back out to home, and through the albums menu
+    script += [('selection', Key.left)] * 2
+    script += [('navigation', Key.home), ('navigation', Key.down)]
+    script += [('selection', Key.right)]
+    script += [('navigation', Key.down)] * (scrolls // 4)
+    script += [('selection', Key.right), ('selection', Key.left)] * 10
+    return script
+
+
+class Tracer:
+    """timestamps keys as they are pressed, and stamps them done when the
+    frame drawn after the controller acts on them is written"""
+
+    def __init__(self, controller: Controller):
+        self.lock = threading.Lock()
+        # keys handled but not yet drawn, as (kind, start time, event)
+        self.handled = list()
+        self.latencies = dict()
+        self.frames = threading.Event()
+        self._handle_key = controller.handle_key
+        self._refresh = controller.view.refresh
+        controller.handle_key = self.handle_key
+        controller.view.refresh = self.refresh
+        self.pending = None
+
+    def handle_key(self, *args):
+        result = self._handle_key(*args)
+        # handled and queued in the same tick, before the frame is drawn
+        with self.lock:
+            self.handled.append(self.pending)
+        return result
+
+    def refresh(self):
+        with self.lock:
+            drawn, self.handled = self.handled, list()
+        self._refresh()
+        end = perf_counter()
+        for kind, start, done in drawn:
+            self.latencies.setdefault(kind, list()).append(end - start)
+            done.set()
+        self.frames.set()
+
+    def press(self, controller: Controller, kind: str, key):
+        """press key and wait until a frame reflects it"""
+        done = threading.Event()
+        self.pending = (kind, perf_counter(), done)
+        controller.on_press(key)
+        if not done.wait(frame_timeout):
+            raise RuntimeError('no frame drawn for %s %s' % (kind, key))
+
+
+def percentile(values: list, percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def replay(script: list) -> dict:
+    """run a controller over the configured library and replay script.
+    returns the latencies of each kind of key."""
+    # the script starts from the home menu, not where the last run left off
+    run.remove_session()
+    controller = Controller()
+    tracer = Tracer(controller)
+    ui_thread = threading.Thread(target=controller.run, daemon=True)
+    ui_thread.start()
+    run.wait_for_scan(controller.library)
+    # let the scan's last frame land before the first key
+    tracer.frames.clear()
+    controller.wake.set()
+    tracer.frames.wait(frame_timeout)
+    try:
+        for kind, key in script:
+            tracer.press(controller, kind, key)
+    finally:
+        controller.quitting = True
+        controller.wake.set()
+        ui_thread.join(frame_timeout)
+    return tracer.latencies
+
+
+def report(size: int, latencies: dict):
+    print('%d tracks' % size)
+    for kind, values in latencies.items():
+        print('%-12s %5d keys  p50 %7.2fms  p99 %7.2fms  max %7.2fms' % (
+            kind, len(values), percentile(values, 50) * 1000,
+            percentile(values, 99) * 1000, max(values) * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000],
+                        help='tracks in each synthetic library')
+    parser.add_argument('--scrolls', type=int, default=100,
+                        help='length of the scrolling runs in the script')
+    args = parser.parse_args()
+
+    script = get_script(args.scrolls)
+    for size in args.sizes:
+        root = os.path.join(tempfile.gettempdir(), 'aulos_bench_%d' % size)
+        run.prepare_library(root, size)
+        run.configure(root)
+        report(size, replay(script))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""time the hot paths of aulos against a synthetic library, headless.
+
+    python3 -m bench.run --size 10000 --compare
+
+each run appends its timings as a line of json to the output file, tagged
+with the current commit, so runs can be compared across commits.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from time import perf_counter
+
+from bench import stubs
+from bench.generate import generate
+
+stubs.install()
+import cfg  # noqa: E402
+import view  # noqa: E402
+import model  # noqa: E402
+import playlist  # noqa: E402
+import cache  # noqa: E402
+from controller import Controller  # noqa: E402
+
+# views clear the terminal when collected, which would wipe the results
+view.View.__del__ = lambda self: None
+
+projdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(func, repeat: int, setup=None) -> dict:
+    """call func repeat times, each after an untimed setup if given. setup's
+    return value is passed to func."""
+    times = list()
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = perf_counter()
+        if setup:
+            func(state)
+        else:
+            func()
+        times.append(perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times),
+            'repeat': repeat}
+
+
+def prepare_library(root: str, size: int):
+    """generate a library under root unless one of this size is there"""
+    marker = os.path.join(root, 'size')
+    try:
+        with open(marker) as marker_file:
+            if int(marker_file.read()) == size:
+                return
+    except (OSError, ValueError):
+        pass
+    print('generating %d tracks in %s...' % (size, root), file=sys.stderr)
+    generate(root, size)
+    with open(marker, 'w') as marker_file:
+        marker_file.write(str(size))
+
+
+def configure(root: str):
+    cfg.music_dir = os.path.join(root, 'music')
+    cfg.playlist_dir = os.path.join(root, 'playlists')
+    cfg.library_cache_path = os.path.join(root, 'library_cache')
+    cfg.history_path = os.path.join(root, 'history')
+    cfg.session_path = os.path.join(root, 'session')
+    cfg.art_cache_dir = os.path.join(root, 'art')
+    cfg.stats_path = os.path.join(root, 'stats')
+
+
+def remove_cache():
+    try:
+        os.remove(cfg.library_cache_path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_session():
+    try:
+        os.remove(cfg.session_path)
+    except FileNotFoundError:
+        pass
+
+
+def scanned_library() -> model.Library:
+    library = model.Library()
+    library.scan()
+    return library
+
+
+def wait_for_scan(library: model.Library):
+    while library.get_progress()[0]:
+        time.sleep(0.01)
+
+
+def bench_scan_cold(repeat: int) -> dict:
+    def setup():
+        remove_cache()
+    return measure(lambda _: scanned_library(), repeat, setup)
+
+
+def bench_scan_warm(repeat: int) -> dict:
+    scanned_library()  # make sure the cache is written
+    return measure(scanned_library, repeat)
+
+
+def bench_index_build(repeat: int) -> dict:
+    """file cached records into the browse indexes, without touching disk"""
+    scanned_library()
+    records = cache.load(cfg.library_cache_path, cfg.music_dir)
+
+    def build():
+        library = model.Library()
+        for path, record in records.items():
+            library.add_track(path, record)
+    return measure(build, repeat)
+
+
+def _all_dirs() -> list:
+    return [root for root, _, _ in os.walk(cfg.music_dir)]
+
+
+def bench_disk_items_cold(repeat: int) -> dict:
+    dirs = _all_dirs()
+
+    def list_dirs(library):
+        for path in dirs:
+            library.get_disk_items(path)
+    return measure(list_dirs, repeat, model.Library)
+
+
+def bench_disk_items_warm(repeat: int) -> dict:
+    """list directories already cached. only as many as the cache holds are
+    listed, or each would be evicted before it was listed again"""
+    dirs = _all_dirs()[:cfg.dir_cache_size]
+    library = model.Library()
+
+    def list_dirs():
+        for path in dirs:
+            library.get_disk_items(path)
+    list_dirs()
+    return measure(list_dirs, repeat)
+
+
+def _all_playlists() -> list:
+    return [entry.path for entry in os.scandir(cfg.playlist_dir)]
+
+
+def bench_playlist_parse(repeat: int) -> dict:
+    playlists = _all_playlists()
+
+    def parse_all():
+        for path in playlists:
+            playlist.parse(path)
+    return measure(parse_all, repeat)
+
+
+def bench_playlist_cached(repeat: int) -> dict:
+    playlists = _all_playlists()
+
+    def load_all():
+        for path in playlists:
+            playlist.get_entries(path)
+    load_all()
+    return measure(load_all, repeat)
+
+
+def bench_update_menu(repeat: int, steps: int = 100) -> dict:
+    """scroll the tracks menu, drawing every step"""
+    library = scanned_library()
+    screen = view.View()
+    screen.menu_stack.append(view.Display(library.get_tracks(), 'tracks'))
+
+    def scroll():
+        for _ in range(steps):
+            screen.navigate_down()
+            screen.update_menu()
+            screen.refresh()
+    return measure(scroll, repeat)
+
+
+def bench_tick(repeat: int, ticks: int = 100) -> dict:
+    """tick the controller on the tracks menu while a track plays"""
+    remove_session()
+    controller = Controller()
+    wait_for_scan(controller.library)
+    tracks = controller.library.get_tracks()
+    controller.view.menu_stack.append(view.Display(tracks, 'tracks'))
+    controller.player.play(tracks[0].path)
+
+    def tick():
+        for _ in range(ticks):
+            controller.tick()
+    return measure(tick, repeat)
+
+
+benchmarks = {
+    'scan_cold': bench_scan_cold,
+    'scan_warm': bench_scan_warm,
+    'index_build': bench_index_build,
+    'disk_items_cold': bench_disk_items_cold,
+    'disk_items_warm': bench_disk_items_warm,
+    'playlist_parse': bench_playlist_parse,
+    'playlist_cached': bench_playlist_cached,
+    'update_menu_x100': bench_update_menu,
+    'tick_x100': bench_tick,
+}
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=projdir,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_previous(output: str, size: int) -> dict:
+    """return the last saved run for a library of this size"""
+    previous = None
+    try:
+        with open(output) as output_file:
+            for line in output_file:
+                run = json.loads(line)
+                if run.get('size') == size:
+                    previous = run
+    except (OSError, ValueError):
+        pass
+    return previous
+
+
+def report(run: dict, previous: dict = None):
+    print('commit %s, %d tracks' % (run['commit'], run['size']))
+    if previous:
+        print('compared with commit %s' % previous['commit'])
+    for name, result in run['results'].items():
+        line = '%-18s min %9.2fms  median %9.2fms' % (
+            name, result['min'] * 1000, result['median'] * 1000)
+        old = previous['results'].get(name) if previous else None
+        if old:
+            change = (result['median'] - old['median']) / old['median'] * 100
+            line += '  %+6.1f%%' % change
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000,
+                        help='tracks in the synthetic library')
+    parser.add_argument('--library', default=None,
+                        help='where to generate the library; reused if it '
+                             'already holds one of the same size')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', choices=list(benchmarks),
+                        help='run only these benchmarks')
+    parser.add_argument('--output', default=os.path.join(projdir,
+                                                         'bench_output.txt'))
+    parser.add_argument('--compare', action='store_true',
+                        help='compare with the last saved run of this size')
+    args = parser.parse_args()
+
+    root = args.library or os.path.join(tempfile.gettempdir(),
+                                        'aulos_bench_%d' % args.size)
+    prepare_library(root, args.size)
+    configure(root)
+
+    results = dict()
+    for name, benchmark in benchmarks.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = benchmark(args.repeat)
+
+    run = {
+        'commit': get_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'size': args.size,
+        'results': results
+    }
+    previous = load_previous(args.output, args.size) if args.compare else None
+    report(run, previous)
+    with open(args.output, 'a') as output_file:
+        output_file.write(json.dumps(run) + '\n')
+
+
+if __name__ == '__main__':
+    main()
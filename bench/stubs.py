@@ -0,0 +1,207 @@
+"""headless stand-ins for vlc, curses and pynput. install() must be called
+before anything from src is imported."""
+import sys
+import enum
+import types
+
+_vlc_ms_per_track = 180000
+
+
+class FakeScreen:
+    """a curses window that counts calls instead of drawing"""
+
+    def __init__(self, max_y: int = 24, max_x: int = 80):
+        self.max_yx = (max_y, max_x)
+        self.calls = 0
+
+    def getmaxyx(self):
+        return self.max_yx
+
+    def _call(self, *args):
+        self.calls += 1
+
+    addstr = addch = hline = border = erase = refresh = move = clrtoeol = _call
+
+
+def _make_curses() -> types.ModuleType:
+    curses = types.ModuleType('curses')
+    curses.screen = FakeScreen()
+    curses.A_NORMAL = 0
+    curses.A_REVERSE = 1 << 18
+    curses.ACS_RTEE = curses.ACS_LTEE = curses.ACS_HLINE = 0
+    curses.initscr = lambda: curses.screen
+    curses.curs_set = lambda visibility: None
+    curses.endwin = lambda: None
+    curses.is_term_resized = lambda lines, cols: False
+    curses.resizeterm = lambda lines, cols: None
+    return curses
+
+
+class _State(enum.IntEnum):
+    NothingSpecial = 0
+    Opening = 1
+    Buffering = 2
+    Playing = 3
+    Paused = 4
+    Stopped = 5
+    Ended = 6
+    Error = 7
+
+
+class _EventType(enum.IntEnum):
+    MediaPlayerPlaying = 260
+    MediaPlayerPaused = 261
+    MediaPlayerStopped = 262
+    MediaPlayerEndReached = 265
+    MediaPlayerEncounteredError = 266
+    MediaPlayerTimeChanged = 267
+
+
+class _MediaParseFlag(enum.IntEnum):
+    local = 0
+
+
+class _EventManager:
+    def __init__(self):
+        self.callbacks = dict()
+
+    def event_attach(self, event_type, callback, *args):
+        self.callbacks.setdefault(event_type, []).append(callback)
+
+
+class _Media:
+    def __init__(self, mrl: str = None):
+        self.mrl = mrl
+
+    def parse_with_options(self, flags, timeout):
+        return 0
+
+    def add_option(self, option: str):
+        return
+
+    def get_mrl(self) -> str:
+        return self.mrl
+
+
+class _MediaPlayer:
+    def __init__(self, *args):
+        self.media = _Media(args[0]) if args else None
+        self.state = _State.NothingSpecial
+        self.events = _EventManager()
+        self.time = 0
+
+    def set_media(self, media):
+        self.media = media
+
+    def get_media(self):
+        return self.media
+
+    def event_manager(self):
+        return self.events
+
+    def play(self) -> int:
+        self.state = _State.Playing
+        return 0
+
+    def pause(self):
+        self.state = _State.Paused
+
+    def set_pause(self, paused: int):
+        self.state = _State.Paused if paused else _State.Playing
+
+    def stop(self):
+        self.state = _State.Stopped
+
+    def get_state(self):
+        return self.state
+
+    def is_playing(self) -> int:
+        return int(self.state == _State.Playing)
+
+    def get_length(self) -> int:
+        return _vlc_ms_per_track
+
+    def get_time(self) -> int:
+        return self.time
+
+    def set_time(self, time: int):
+        self.time = time
+
+
+class _Instance:
+    def __init__(self, *args):
+        return
+
+    def media_new(self, mrl: str):
+        return _Media(mrl)
+
+    def media_player_new(self):
+        return _MediaPlayer()
+
+
+def make_vlc() -> types.ModuleType:
+    """return a stand-in vlc module. the tests set it on model directly, to
+    drive a Player without installing it for everything else"""
+    vlc = types.ModuleType('vlc')
+    vlc.State = _State
+    vlc.EventType = _EventType
+    vlc.MediaParseFlag = _MediaParseFlag
+    vlc.Media = _Media
+    vlc.MediaPlayer = _MediaPlayer
+    vlc.Instance = _Instance
+    return vlc
+
+
+class _Key(enum.Enum):
+    up = 'up'
+    down = 'down'
+    left = 'left'
+    right = 'right'
+    enter = 'enter'
+    esc = 'esc'
+    space = 'space'
+    backspace = 'backspace'
+    page_up = 'page_up'
+    page_down = 'page_down'
+    home = 'home'
+    end = 'end'
+
+
+class _KeyCode:
+    def __init__(self, char: str = None):
+        self.char = char
+
+    @classmethod
+    def from_char(cls, char: str):
+        return cls(char)
+
+
+class _Listener:
+    def __init__(self, on_press=None, on_release=None):
+        self.on_press = on_press
+        self.running = False
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+
+def _make_pynput() -> types.ModuleType:
+    pynput = types.ModuleType('pynput')
+    keyboard = types.ModuleType('pynput.keyboard')
+    keyboard.Key = _Key
+    keyboard.KeyCode = _KeyCode
+    keyboard.Listener = _Listener
+    pynput.keyboard = keyboard
+    return pynput
+
+
+def install():
+    """replace vlc, curses and pynput for everything imported afterwards"""
+    pynput = _make_pynput()
+    sys.modules['vlc'] = make_vlc()
+    sys.modules['curses'] = _make_curses()
+    sys.modules['pynput'] = pynput
+    sys.modules['pynput.keyboard'] = pynput.keyboard
@@ -0,0 +1,232 @@
+"""album art as monochrome block characters.
+
+art is extracted from a track's tags or a folder image, scaled to the art
+area, error-diffusion dithered, and packed two by two pixels into unicode
+quadrant blocks. rendering needs numpy and pillow; without them art is
+simply not shown. renders are cached on disk per album and size, and made
+on a background thread so the ui never waits on one."""
+import os
+import io
+import hashlib
+import threading
+import importlib.util
+
+import cfg
+import stats
+import atomic
+from lru import LRUCache
+
+# front cover, as numbered by id3 and flac alike
+_front_cover = 3
+
+# indexed by top left + 2 * top right + 4 * bottom left + 8 * bottom right
+_blocks = ' ▘▝▀▖▌▞▛▗▚▐▜▄▙▟█'
+
+
+def is_available() -> bool:
+    """true if numpy and pillow are installed, without importing them"""
+    return all(importlib.util.find_spec(name) is not None
+               for name in ('numpy', 'PIL'))
+
+
+def _pick_picture(pictures: list) -> bytes:
+    """return the front cover if there is one, else the first picture"""
+    if not pictures:
+        return None
+    for picture in pictures:
+        if picture.type == _front_cover:
+            return picture.data
+    return pictures[0].data
+
+
+def _read_folder_image(track_path: str) -> bytes:
+    directory = os.path.dirname(track_path)
+    try:
+        names = {entry.name.lower(): entry.path
+                 for entry in os.scandir(directory) if entry.is_file()}
+    except OSError:
+        return None
+    for name in cfg.art_file_names:
+        if name in names:
+            with open(names[name], 'rb') as image_file:
+                return image_file.read()
+    return None
+
+
+def extract_image(track_path: str) -> bytes:
+    """return the encoded image embedded in a track, or else one from its
+    folder, or None"""
+    # art is only rendered on the worker, so mutagen is imported there
+    from mutagen import MutagenError
+    from mutagen.id3 import ID3
+    from mutagen.flac import FLAC
+    ext = os.path.splitext(track_path)[1].lower()
+    data = None
+    try:
+        if ext == '.mp3':
+            data = _pick_picture(ID3(track_path).getall('APIC'))
+        elif ext == '.flac':
+            data = _pick_picture(FLAC(track_path).pictures)
+    except (MutagenError, OSError):
+        pass
+    if data is None:
+        try:
+            data = _read_folder_image(track_path)
+        except OSError:
+            pass
+    return data
+
+
+def scale(data: bytes, cols: int, rows: int):
+    """decode an image to a grayscale array filling cols by rows characters,
+    two by two pixels each, with values from 0 to 1. characters are about
+    twice as tall as wide, so the image is cropped to that aspect first."""
+    # numpy and pillow are slow to import, and optional
+    import numpy
+    from PIL import Image, ImageOps
+    image = Image.open(io.BytesIO(data)).convert('L')
+    image = ImageOps.fit(image, (cols, rows * 2))
+    image = image.resize((cols * 2, rows * 2))
+    return numpy.asarray(image, dtype=numpy.float32) / 255
+
+
+def dither(pixels):
+    """floyd-steinberg dither pixels to a boolean array. a pixel's error
+    spreads right and to the row below, so all pixels with equal 2 * y + x
+    are independent, and each such diagonal is dithered at once."""
+    import numpy  # optional; see scale
+    height, width = pixels.shape
+    # padded so error spreading past the edges lands somewhere harmless
+    buffer = numpy.zeros((height + 1, width + 2), dtype=numpy.float32)
+    buffer[:height, 1:width + 1] = pixels
+    bits = numpy.zeros((height, width), dtype=bool)
+    for diagonal in range(width + 2 * (height - 1)):
+        first = max(0, (diagonal - width + 2) // 2)
+        last = min(height - 1, diagonal // 2)
+        ys = numpy.arange(first, last + 1)
+        xs = diagonal - 2 * ys
+        # buffer columns are offset by the padding
+        old = buffer[ys, xs + 1]
+        new = old >= 0.5
+        bits[ys, xs] = new
+        error = old - new
+        buffer[ys, xs + 2] += error * (7 / 16)
+        buffer[ys + 1, xs] += error * (3 / 16)
+        buffer[ys + 1, xs + 1] += error * (5 / 16)
+        buffer[ys + 1, xs + 2] += error * (1 / 16)
+    return bits
+
+
+def to_blocks(bits) -> list:
+    """pack a boolean array into lines of quadrant block characters"""
+    import numpy  # optional; see scale
+    height, width = bits.shape
+    padded = numpy.zeros((height + height % 2, width + width % 2), dtype=int)
+    padded[:height, :width] = bits
+    codes = (padded[0::2, 0::2] + 2 * padded[0::2, 1::2] +
+             4 * padded[1::2, 0::2] + 8 * padded[1::2, 1::2])
+    return [''.join(_blocks[code] for code in row) for row in codes.tolist()]
+
+
+@stats.timed('art.render')
+def render(track_path: str, cols: int, rows: int) -> list:
+    """return a track's art as rows lines of cols characters, or None"""
+    data = extract_image(track_path)
+    if data is None:
+        return None
+    try:
+        pixels = scale(data, cols, rows)
+    except (OSError, ValueError):
+        # not an image pillow can decode
+        return None
+    return to_blocks(dither(pixels))
+
+
+def get_album_key(track_path: str, tags: dict) -> tuple:
+    """tracks of one album share art; untagged tracks share by folder"""
+    album = tags.get('album')
+    if album:
+        artist = tags.get('artist') or ['']
+        return ('album', artist[0], album[0])
+    return ('folder', os.path.dirname(track_path))
+
+
+def _get_cache_path(key: tuple, cols: int, rows: int) -> str:
+    digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+    return os.path.join(cfg.art_cache_dir,
+                        '%s_%dx%d.txt' % (digest, cols, rows))
+
+
+def _load_cached(cache_path: str) -> list:
+    try:
+        with open(cache_path, encoding='utf-8') as cache_file:
+            return cache_file.read().split('\n')
+    except OSError:
+        return None
+
+
+def _save_cached(cache_path: str, lines: list):
+    try:
+        with atomic.write_file(cache_path) as cache_file:
+            cache_file.write('\n'.join(lines))
+    except OSError:
+        pass
+
+
+class ArtCache:
+    """rendered art by album and size. misses are rendered on a worker
+    thread, and on_ready is called once each is available. only the latest
+    request is kept, so skipping through tracks doesn't build a backlog."""
+
+    def __init__(self, on_ready=None):
+        self.on_ready = on_ready
+        # lists of lines, or an empty list for albums without art
+        self.rendered = LRUCache(cfg.art_cache_size)
+        self.lock = threading.Lock()
+        self.pending = None
+        self.requested = threading.Event()
+        self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+
+    def get(self, track_path: str, tags: dict, cols: int, rows: int) -> list:
+        """return a track's art if rendered, else request it and return None.
+        albums without art return an empty list."""
+        key = (get_album_key(track_path, tags), cols, rows)
+        lines = self.rendered.get(key)
+        if lines is None:
+            with self.lock:
+                self.pending = (key, track_path)
+            self.requested.set()
+        return lines
+
+    def _work(self):
+        while True:
+            self.requested.wait()
+            with self.lock:
+                self.requested.clear()
+                request, self.pending = self.pending, None
+            if request is None or request[0] in self.rendered:
+                continue
+            key, track_path = request
+            try:
+                lines = self._load(key, track_path)
+            except Exception:
+                # e.g. pillow's DecompressionBombError. the album is shown
+                # without art, rather than ending the worker for good
+                lines = list()
+            self.rendered.put(key, lines)
+            if self.on_ready:
+                self.on_ready()
+
+    @staticmethod
+    def _load(key: tuple, track_path: str) -> list:
+        album_key, cols, rows = key
+        cache_path = _get_cache_path(album_key, cols, rows)
+        lines = _load_cached(cache_path)
+        if lines is None:
+            lines = render(track_path, cols, rows)
+            if lines is None:
+                # not saved to disk, in case art is added later
+                return list()
+            _save_cached(cache_path, lines)
+        return lines
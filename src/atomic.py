@@ -0,0 +1,28 @@
+"""write files whole or not at all"""
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def write_file(path: str, binary: bool = False):
+    """open a temporary file beside path for writing, and move it over path
+    once the block finishes. readers see the old file or the new one, never
+    a partial write. missing directories are made."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    if binary:
+        temp_file = open(temp_path, 'wb')
+    else:
+        temp_file = open(temp_path, 'w', encoding='utf-8')
+    try:
+        with temp_file:
+            yield temp_file
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,88 @@
+"""nested, sorted indexes for browsing the library by tag"""
+from array import array
+
+from search import natural_key
+from tracks import new_posting_list
+
+
+class BrowseIndex:
+    """track ids filed under one tag value per level, e.g. an artist, then
+    an album. each level's keys are sorted by collation keys made once per
+    value, and leaves are sorted by sort_key, a function of track id. sorted
+    levels are kept until they change, so once the scan is done and finish
+    has been called, browsing is a lookup."""
+
+    def __init__(self, levels: tuple, collation: dict, sort_key=None):
+        self.levels = levels  # the tag key of each level, e.g. 'artist'
+        self.root = dict()
+        # natural sort keys by value, shared between indexes
+        self.collation = collation
+        self.sort_key = sort_key
+        # sorted keys of a level, or sorted track ids of a leaf, by key path
+        self.sorted = dict()
+
+    def __len__(self) -> int:
+        return len(self.root)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.root
+
+    def add(self, keys: tuple, track_id: int):
+        """file a track under a path of one key per level"""
+        node = self.root
+        last = len(keys) - 1
+        for depth, key in enumerate(keys):
+            if key not in node:
+                if key not in self.collation:
+                    self.collation[key] = natural_key(key)
+                node[key] = new_posting_list() if depth == last else dict()
+                self.sorted.pop(keys[:depth], None)
+            node = node[key]
+        node.append(track_id)
+        self.sorted.pop(keys, None)
+
+    def _get_node(self, keys: tuple):
+        node = self.root
+        for key in keys:
+            node = node.get(key)
+            if node is None:
+                return None
+        return node
+
+    def get_keys(self, keys: tuple = ()) -> list:
+        """return the sorted keys of the level below a path. the list is
+        shared, and must not be changed."""
+        if keys in self.sorted:
+            return self.sorted[keys]
+        node = self._get_node(keys)
+        if not isinstance(node, dict):
+            return list()
+        ordered = sorted(node, key=self.collation.__getitem__)
+        self.sorted[keys] = ordered
+        return ordered
+
+    def get_tracks(self, keys: tuple) -> array:
+        """return the sorted track ids at the end of a path. the array is
+        shared, and must not be changed."""
+        if keys in self.sorted:
+            return self.sorted[keys]
+        node = self._get_node(keys)
+        if not isinstance(node, array):
+            return new_posting_list()
+        # a copy, so tracks filed later don't change a menu already shown
+        ordered = new_posting_list()
+        ordered.extend(sorted(node, key=self.sort_key) if self.sort_key
+                       else node)
+        self.sorted[keys] = ordered
+        return ordered
+
+    def finish(self):
+        """sort every level and leaf ahead of browsing"""
+        pending = [()]
+        while pending:
+            keys = pending.pop()
+            if len(keys) == len(self.levels):
+                self.get_tracks(keys)
+                continue
+            for key in self.get_keys(keys):
+                pending.append(keys + (key,))
@@ -0,0 +1,54 @@
+"""persistent on-disk index of library tracks and their tags"""
+import os
+import pickle
+from typing import NamedTuple
+
+import atomic
+
+# bump whenever the layout of TrackRecord or its tags changes
+CACHE_VERSION = 3
+
+
+class TrackRecord(NamedTuple):
+    """a track's file stats at scan time, and the tags read from it, packed
+    by tags.pack"""
+    size: int
+    mtime: int  # nanoseconds, from os.stat
+    tags: tuple
+
+
+def is_stale(record: TrackRecord, stat: os.stat_result) -> bool:
+    """true if the file has changed since the record was made"""
+    if record is None:
+        return True
+    return record.size != stat.st_size or record.mtime != stat.st_mtime_ns
+
+
+def load(cache_path: str, music_dir: str) -> dict:
+    """return a dict of track paths to records, or an empty dict if the
+    cache is missing, unreadable, outdated, or for another music directory"""
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            contents = pickle.load(cache_file)
+    except (OSError, EOFError, pickle.UnpicklingError,
+            AttributeError, ImportError, ValueError):
+        return dict()
+
+    if not isinstance(contents, dict):
+        return dict()
+    if contents.get('version') != CACHE_VERSION:
+        return dict()
+    if contents.get('music_dir') != music_dir:
+        return dict()
+    return contents.get('tracks', dict())
+
+
+def save(cache_path: str, music_dir: str, records: dict):
+    """pickle records, for the next scan of music_dir to start from"""
+    contents = {
+        'version': CACHE_VERSION,
+        'music_dir': music_dir,
+        'tracks': records
+    }
+    with atomic.write_file(cache_path, binary=True) as cache_file:
+        pickle.dump(contents, cache_file, pickle.HIGHEST_PROTOCOL)
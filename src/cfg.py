@@ -1,7 +1,12 @@
 """user settings"""
+import os
 
-# in seconds, lower should be more responsive
-refresh_rate = 0.01
+# the ui only redraws on input or player events, and otherwise idles.
+# while playing, the progress bar redraws every progress_refresh_rate seconds
+# of playback time. while the library is scanning, progress is reported every
+# scan_refresh_rate seconds.
+progress_refresh_rate = 1.0
+scan_refresh_rate = 0.25
 
 # in seconds, after this is reached 'skip back' resets to track start instead
 # of skipping to the last played track.
@@ -10,7 +15,58 @@ skip_back_threshold = 5.0
 music_dir = "/Users/Ben/Desktop/test_music"
 music_formats = ('.mp3', '.flac')
 playlist_dir = "/Users/Ben/Desktop/test_playlists"
-playlist_formats = ('.m3u')
+playlist_formats = ('.m3u', '.m3u8')
+# parsed playlists kept in memory, reparsed only when the file changes
+playlist_cache_size = 32
+# directory listings kept in memory, reread only when the directory changes
+dir_cache_size = 64
+# library index, kept beside this file. tracks are only re-read on startup if
+# their size or modification time has changed since the last scan.
+library_cache_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  '.library_cache')
+# tags of new or changed tracks are read by a pool of workers, each handed
+# scan_batch_size tracks at a time. processes sidestep the GIL, but threads
+# start faster and are enough when scanning is bound by disk reads.
+scan_workers = 4
+scan_batch_size = 64
+scan_use_processes = False
+# tags kept in memory for tracks played from outside the library
+tag_cache_size = 256
+# holding up or down scrolls one more line per keypress after every
+# scroll_accel_presses repeats, up to scroll_max_step lines. presses closer
+# together than scroll_repeat_window seconds count as the key being held.
+scroll_repeat_window = 0.1
+scroll_accel_presses = 10
+scroll_max_step = 10
+# album art, drawn when numpy and pillow are installed. art takes art_rows
+# lines from the menu, unless that would leave fewer than art_min_menu_lines.
+show_art = True
+art_rows = 8
+art_min_menu_lines = 6
+# folder images to use for tracks without embedded art, lowercase
+art_file_names = ('cover.jpg', 'cover.png', 'folder.jpg', 'folder.png',
+                  'front.jpg', 'front.png')
+art_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '.art_cache')
+art_cache_size = 32
+
+# parsed tracks kept ready to play, recent and upcoming
+media_cache_size = 8
+
+# menus, queue and playback position saved at exit
+session_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            '.session')
+
+# recently played tracks to remember, and where to keep them
+history_size = 200
+history_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            '.history')
+
+# collect timings of the hot paths from startup. press 'd' to show them on
+# screen regardless. anything collected is written to stats_path on exit.
+stats_enabled = False
+stats_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'stats.txt')
 
 # text strings
 day_str = "d, "
@@ -18,6 +74,7 @@ hour_str = "h, "
 no_time_str = "-:--"
 no_load_str = "..."
 empty_str = "empty"
+unknown_str = "unknown"
 time_sep_str = " of "
 track_sep_str = " by "
 paused_str = "paused."
@@ -25,17 +82,26 @@ playing_str = "now playing:"
 play_next_str = " queued next."
 play_last_str = " queued last."
 ended_str = "playback ended."
+# indexed by whether shuffled, and by model.RepeatMode
+shuffle_strs = ("shuffle off.", "shuffle on.")
+repeat_strs = ("repeat off.", "repeat all.", "repeat one.")
 no_media_str = "nothing playing."
 play_error_str = "couldn't play file."
 load_error_str = "unable to load."
+vlc_error_str = "couldn't load VLC; nothing can be played."
 not_implemented_str = "not yet implemented!"
+loading_str = "scanning library: {} of {}"
+search_str = "search: "
+loaded_str = "library loaded in {:.2f}s."
 home_menu_items = [
     "playlists",
     "albums",
     "artists",
     "genres",
+    "years",
     "tracks",
     "queue",
+    "recent",
     "settings",
     "quit"
 ]
@@ -45,6 +111,13 @@ media_option_items = [
     "queue next",
     "queue last",
 ]
+queue_option_items = [
+    "play next",
+    "move up",
+    "move down",
+    "remove",
+    "clear queue",
+]
 
 # symbols
 home_icon = '☯'
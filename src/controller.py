@@ -1,11 +1,18 @@
 import os
-from time import sleep
+import queue
+import signal
+import threading
+from time import monotonic, perf_counter
 from enum import IntEnum
 from pynput.keyboard import Listener, KeyCode, Key
 
 import cfg
-from view import View, ItemType, Display, DisplayItem
-from model import Player, Library
+from view import View, ItemType, Display, DisplayItem, LazyItems
+from model import Player, Library, RepeatMode
+from search import filter_items
+import session
+import stats
+import art
 
 
 class HomeOptions(IntEnum):
@@ -14,10 +21,12 @@ class HomeOptions(IntEnum):
     ALBUMS = 1
     ARTISTS = 2
     GENRES = 3
-    TRACKS = 4
-    QUEUE = 5
-    SETTINGS = 6
-    EXIT = 7
+    YEARS = 4
+    TRACKS = 5
+    QUEUE = 6
+    RECENT = 7
+    SETTINGS = 8
+    EXIT = 9
 
 
 class MediaOptions(IntEnum):
@@ -28,6 +37,15 @@ class MediaOptions(IntEnum):
     QUEUE_LAST = 3
 
 
+class QueueOptions(IntEnum):
+    """menu options for a track in the queue"""
+    PLAY_NEXT = 0
+    MOVE_UP = 1
+    MOVE_DOWN = 2
+    REMOVE = 3
+    CLEAR = 4
+
+
 class Direction(IntEnum):
     """navigational directions"""
     UP = 1
@@ -36,13 +54,64 @@ class Direction(IntEnum):
     BACK = 4
 
 
+# keys whose repeats are merged into a single move
+_scroll_keys = (Key.up, Key.down)
+
+
+def coalesce(commands: list) -> list:
+    """merge runs of the same scrolling key into one command, so a burst of
+    thirty down presses becomes a single thirty line move"""
+    merged = list()
+    for key, step in commands:
+        if merged and key in _scroll_keys and merged[-1][0] == key:
+            merged[-1] = (key, merged[-1][1] + step)
+        else:
+            merged.append((key, step))
+    return merged
+
+
 class Controller:
     """handle menu transitions, and act as gobetween for model/view"""
 
-    def __init__(self):
-        self.view = View()
+    def __init__(self, view: View = None, start_time: float = None):
+        """view may be passed in already drawn, and start_time given as the
+        perf_counter time at launch, so startup can be timed in full"""
+        self.view = view or View()
+        self.start_time = perf_counter() if start_time is None else start_time
         self.library = Library()
-        self.player = Player(self.library)
+        # set by input and player events to wake the main loop
+        self.wake = threading.Event()
+        self.quitting = False
+        # (key, scroll step) pairs from the listener thread. the main loop
+        # is the only one to act on them, so it alone changes menu state.
+        self.commands = queue.SimpleQueue()
+        self.player = Player(self.library, self.wake.set)
+        self.scan_progress = None
+        # the text typed so far while searching, or None when not searching
+        self.search_query = None
+        self.search_base: Display = None
+        # the last scrolling key, when it was pressed, and how many times
+        # it has repeated while held
+        self.scroll_key = None
+        self.scroll_time = 0.0
+        self.scroll_repeats = 0
+        # version of the queue last shown, and the path and position of the
+        # queued track being edited
+        self.queue_version = None
+        self.queue_item = None
+        self.art = None
+        if cfg.show_art and art.is_available():
+            self.art = art.ArtCache(self.wake.set)
+            self.view.enable_art()
+        self.show_stats = False
+        if cfg.stats_enabled:
+            stats.enable()
+        # true once any key has been handled
+        self.touched = False
+        self.last_session = session.load(cfg.session_path)
+        self.restore_queue()
+        self.library.start_scan()
+        self.player.start_loading()
 
     def handle_track_select(self):
         display = self.view.menu_stack[-1]
@@ -50,9 +119,11 @@ class Controller:
         path = selected_item.path
         name = os.path.basename(display.menu_path)
         if path == cfg.media_option_items[MediaOptions.PLAY]:
-            self.player.play(display.menu_path)
             self.view.menu_stack.pop()
-            self.view.notify(cfg.playing_str)
+            if not self.player.play(display.menu_path):
+                self.view.notify(cfg.play_error_str)
+            else:
+                self.view.notify(cfg.playing_str)
         elif path == cfg.media_option_items[MediaOptions.QUEUE_NEXT]:
             self.player.queue_next(display.menu_path)
             self.view.menu_stack.pop()
@@ -78,20 +149,85 @@ class Controller:
 
     def handle_queue_select(self):
         display_path = cfg.home_menu_items[HomeOptions.QUEUE]
-        display_items = []
-        for item in self.player.next_tracks:
-            display_items.append(DisplayItem(ItemType.Track, item))
+        queue, self.queue_version = self.player.next_tracks.snapshot()
+        display_items = LazyItems(ItemType.Track, queue)
         new_display = Display(display_items, display_path)
         self.view.menu_stack.append(new_display)
 
+    def update_queue_display(self):
+        """refresh the queue menu, only if the queue changed since shown"""
+        # an int read, so an unchanged queue isn't copied every tick
+        if self.player.next_tracks.version == self.queue_version:
+            return
+        queue, self.queue_version = self.player.next_tracks.snapshot()
+        display = self.view.menu_stack.pop()
+        display_items = LazyItems(ItemType.Track, queue)
+        self.view.menu_stack.append(display._replace(items=display_items))
+        # keep the selection within the queue if it shrank
+        self.view.navigate_to(self.view.get_position())
+
+    def find_queued(self, path: str, position: int) -> int:
+        """return where path is in the queue, preferring position if it's
+        still there, or None if it's no longer queued"""
+        queue = self.player.next_tracks
+        try:
+            if position >= len(queue) or queue[position] != path:
+                # the queue menu is filtered, or changed since shown
+                position = queue.index(path)
+        except (ValueError, IndexError):
+            return None
+        return position
+
+    def handle_queue_item_select(self, display: Display):
+        """show editing options for the selected queued track"""
+        item = display.get_selected_item()
+        position = self.find_queued(item.path,
+                                    display.start_index + display.index)
+        if position is None:
+            self.view.notify(cfg.load_error_str)
+            return
+        self.queue_item = (item.path, position)
+        items = [DisplayItem(ItemType.Menu, opt)
+                 for opt in cfg.queue_option_items]
+        name = os.path.basename(item.path)
+        new_display = Display(items, os.path.join(display.menu_path, name))
+        self.view.menu_stack.append(new_display)
+
+    def handle_queue_option_select(self, item: DisplayItem):
+        # the queue may have moved on since the options were shown
+        path, position = self.queue_item
+        position = self.find_queued(path, position)
+        clear = item.path == cfg.queue_option_items[QueueOptions.CLEAR]
+        if position is None and not clear:
+            self.view.menu_stack.pop()
+            self.view.notify(cfg.load_error_str)
+            return
+        new_position = position
+        if item.path == cfg.queue_option_items[QueueOptions.PLAY_NEXT]:
+            new_position = 0
+            self.player.move_queued(position, new_position)
+        elif item.path == cfg.queue_option_items[QueueOptions.MOVE_UP]:
+            new_position = max(0, position - 1)
+            self.player.move_queued(position, new_position)
+        elif item.path == cfg.queue_option_items[QueueOptions.MOVE_DOWN]:
+            new_position = min(len(self.player.next_tracks) - 1, position + 1)
+            self.player.move_queued(position, new_position)
+        elif item.path == cfg.queue_option_items[QueueOptions.REMOVE]:
+            self.player.remove_queued(position)
+        elif clear:
+            self.player.clear_queue()
+        self.view.menu_stack.pop()
+        # follow the moved track, unless the queue menu is filtered
+        if self.view.get_position() == position:
+            self.view.navigate_to(new_position)
+
     def handle_playlist_select(self, item, ext, display):
-        tracks = self.library.get_playlist_tracks(display.menu_path)
         playlist = os.path.basename(display.menu_path)
-        items = []
-        for track in tracks:
-            items.append(DisplayItem(ItemType.Track, track))
-
         if item.path == cfg.media_option_items[MediaOptions.VIEW]:
+            entries = self.library.get_playlist_entries(display.menu_path)
+            paths = [entry.path for entry in entries]
+            titles = [entry.title for entry in entries]
+            items = LazyItems(ItemType.Track, paths, titles)
             new_display = Display(items, display.menu_path)
             self.view.menu_stack.append(new_display)
         elif item.path == cfg.media_option_items[MediaOptions.PLAY]:
@@ -101,10 +237,12 @@ class Controller:
                 self.view.notify(cfg.playing_str)
             self.view.menu_stack.pop()
         elif item.path == cfg.media_option_items[MediaOptions.QUEUE_NEXT]:
+            tracks = self.library.get_playlist_tracks(display.menu_path)
             self.player.queue_next(tracks)
             self.view.menu_stack.pop()
             self.view.notify(playlist + cfg.play_next_str)
         elif item.path == cfg.media_option_items[MediaOptions.QUEUE_LAST]:
+            tracks = self.library.get_playlist_tracks(display.menu_path)
             self.player.queue_last(tracks)
             self.view.menu_stack.pop()
             self.view.notify(playlist + cfg.play_last_str)
@@ -115,49 +253,44 @@ class Controller:
         if ext in cfg.music_formats:
             self.handle_track_select()
 
+    def get_browse_index(self, menu_path: str):
+        """return the browse index behind a library menu, or None"""
+        indexes = {
+            cfg.home_menu_items[HomeOptions.ARTISTS]: self.library.artists,
+            cfg.home_menu_items[HomeOptions.ALBUMS]: self.library.albums,
+            cfg.home_menu_items[HomeOptions.YEARS]: self.library.years,
+            cfg.home_menu_items[HomeOptions.GENRES]: self.library.genres,
+        }
+        # keys may contain separators, but the top menu's name can't
+        return indexes.get(menu_path.split(os.sep)[0])
+
     def handle_lib_subset(self):
+        """open the level below the selected key, or its tracks if it's the
+        last level"""
         curr_display = self.view.menu_stack[-1]
-        menu_path = curr_display.menu_path
+        index = self.get_browse_index(curr_display.menu_path)
         key = curr_display.get_selected_item().path
-        if cfg.home_menu_items[HomeOptions.ALBUMS] in menu_path:
-            key_items = self.library.albums.get(key)
-        elif cfg.home_menu_items[HomeOptions.ARTISTS] in menu_path:
-            key_items = self.library.artists.get(key)
-        elif cfg.home_menu_items[HomeOptions.GENRES] in menu_path:
-            key_items = self.library.genres.get(key)
+        keys = curr_display.keys + (key,)
+        if len(keys) < len(index.levels):
+            key_items = self.library.get_keys(index, keys)
+            item_type = ItemType.Directory
+        else:
+            key_items = self.library.get_subset(index, keys)
+            item_type = ItemType.Track
 
         if not key_items:
             self.view.notify(cfg.load_error_str)
             return
-        else:
-            new_item_list = []
-            for item in key_items:
-                new_item_list.append(DisplayItem(ItemType.Track, item))
-            new_path = os.path.join(curr_display.menu_path, key)
-            new_display = Display(new_item_list, new_path)
+        new_item_list = LazyItems(item_type, key_items)
+        new_path = os.path.join(curr_display.menu_path, key)
+        new_display = Display(new_item_list, new_path, keys=keys)
         self.view.menu_stack.append(new_display)
 
-    def handle_album_select(self):
-        path = cfg.home_menu_items[HomeOptions.ALBUMS]
-        display_items = []
-        for key in self.library.albums.keys():
-            display_items.append(DisplayItem(ItemType.Directory, key))
-        display = Display(display_items, path)
-        self.view.menu_stack.append(display)
-
-    def handle_artist_select(self):
-        path = cfg.home_menu_items[HomeOptions.ARTISTS]
-        display_items = []
-        for key in self.library.artists.keys():
-            display_items.append(DisplayItem(ItemType.Directory, key))
-        display = Display(display_items, path)
-        self.view.menu_stack.append(display)
-
-    def handle_genre_select(self):
-        path = cfg.home_menu_items[HomeOptions.GENRES]
-        display_items = []
-        for key in self.library.genres:
-            display_items.append(DisplayItem(ItemType.Directory, key))
+    def handle_browse_select(self, option: HomeOptions):
+        """open a library menu at the top level of its browse index"""
+        path = cfg.home_menu_items[option]
+        keys = self.library.get_keys(self.get_browse_index(path))
+        display_items = LazyItems(ItemType.Directory, keys)
         display = Display(display_items, path)
         self.view.menu_stack.append(display)
 
@@ -175,14 +308,16 @@ class Controller:
             path = cfg.home_menu_items[HomeOptions.TRACKS]
             display = Display(self.library.get_tracks(), path)
             self.view.menu_stack.append(display)
-        elif index == HomeOptions.ALBUMS:
-            self.handle_album_select()
-        elif index == HomeOptions.ARTISTS:
-            self.handle_artist_select()
-        elif index == HomeOptions.GENRES:
-            self.handle_genre_select()
+        elif index in (HomeOptions.ALBUMS, HomeOptions.ARTISTS,
+                       HomeOptions.GENRES, HomeOptions.YEARS):
+            self.handle_browse_select(index)
         elif index == HomeOptions.QUEUE:
             self.handle_queue_select()
+        elif index == HomeOptions.RECENT:
+            path = cfg.home_menu_items[HomeOptions.RECENT]
+            items = LazyItems(ItemType.Track, self.player.history.get_recent())
+            display = Display(items, path)
+            self.view.menu_stack.append(display)
         elif index == HomeOptions.SETTINGS:
             self.view.notify(cfg.not_implemented_str)
         return True
@@ -194,10 +329,18 @@ class Controller:
             return
 
         ext: str = os.path.splitext(display.menu_path)[1]
-        lib_subsets = [cfg.home_menu_items[i] for i in (HomeOptions.ALBUMS, HomeOptions.GENRES)]
+        queue_path = cfg.home_menu_items[HomeOptions.QUEUE]
+        below = None
+        if len(self.view.menu_stack) > 1:
+            below = self.view.menu_stack[-2]
         if not display.menu_path:
             return self.handle_home_select()
-        elif display.menu_path in lib_subsets:
+        elif display.menu_path == queue_path:
+            self.handle_queue_item_select(display)
+        elif below is not None and below.menu_path == queue_path:
+            self.handle_queue_option_select(item)
+        elif (item.item_type is ItemType.Directory and
+              self.get_browse_index(display.menu_path) is not None):
             self.handle_lib_subset()
         elif item.item_type is ItemType.Menu:
             self.handle_menu_select(item, ext, display)
@@ -207,9 +350,142 @@ class Controller:
             self.handle_media_select(item.path, display)
 
     def on_press(self, key: KeyCode):
-        """Callback for handling user input."""
+        """Callback for handling user input. runs on the listener thread, so
+        keys are only queued for the main loop."""
+        step = 1
+        if key in _scroll_keys:
+            # timed here, as presses arrive, not when the queue is drained
+            step = self.get_scroll_step(key)
+        self.commands.put((key, step))
+        self.wake.set()
+
+    def handle_commands(self):
+        """act on every key queued since the last tick"""
+        commands = list()
+        while True:
+            try:
+                commands.append(self.commands.get_nowait())
+            except queue.Empty:
+                break
+        if commands:
+            self.touched = True
+        for key, step in coalesce(commands):
+            if self.handle_key(key, step) is False:
+                self.quitting = True
+                return
+
+    def start_search(self):
+        """filter the current menu as the user types"""
+        # nothing to filter in a directory that couldn't be listed
+        if self.view.menu_stack[-1].items is None:
+            return
+        self.search_query = ''
+        self.search_base = self.view.menu_stack[-1]
+        self.view.menu_stack.append(self.search_base)
+        self.update_search()
+
+    def end_search(self):
+        self.search_query = None
+        self.search_base = None
+        self.view.notify(self.player.get_state_str())
+
+    def get_search_results(self, display: Display, query: str) -> Display:
+        """search the library's indexes from the home menu and the top level
+        library menus. other menus are filtered item by item."""
+        home_items = cfg.home_menu_items
+        indexed_menus = {
+            '': ('title', ItemType.Track),
+            home_items[HomeOptions.TRACKS]: ('title', ItemType.Track),
+            home_items[HomeOptions.ALBUMS]: ('album', ItemType.Directory),
+            home_items[HomeOptions.ARTISTS]: ('artist', ItemType.Directory),
+            home_items[HomeOptions.GENRES]: ('genre', ItemType.Directory),
+        }
+        if display.menu_path not in indexed_menus:
+            items = filter_items(display.items, query)
+            return Display(items, display.menu_path, keys=display.keys)
+
+        # searching from home searches every track
+        menu_path = display.menu_path or home_items[HomeOptions.TRACKS]
+        if not query.strip():
+            items = display.items if display.menu_path else []
+            return Display(items, menu_path)
+        key, item_type = indexed_menus[display.menu_path]
+        paths = self.library.search(key, query)
+        return Display(LazyItems(item_type, paths), menu_path)
+
+    def update_search(self):
+        results = self.get_search_results(self.search_base, self.search_query)
+        self.view.menu_stack.pop()
+        self.view.menu_stack.append(results)
+        self.view.notify(cfg.search_str + self.search_query)
+
+    def handle_search_key(self, key: KeyCode, step: int = 1):
+        """edit the query, or leave search mode keeping or dropping results"""
         if hasattr(key, 'char'):
-            if key.char == 'p':
+            if key.char is None:
+                return
+            self.search_query += key.char
+        elif key == Key.space:
+            self.search_query += ' '
+        elif key == Key.backspace:
+            self.search_query = self.search_query[:-1]
+        elif key in (Key.esc, Key.left):
+            self.end_search()
+            self.view.navigate_back()
+            return
+        elif key == Key.enter:
+            self.end_search()
+            return
+        elif key == Key.up:
+            self.view.navigate_up(step)
+            return
+        elif key == Key.down:
+            self.view.navigate_down(step)
+            return
+        elif key == Key.right:
+            self.end_search()
+            return self.handle_select()
+        else:
+            return
+        self.update_search()
+
+    def get_scroll_step(self, key: KeyCode) -> int:
+        """return how many lines to scroll, speeding up while key is held"""
+        now = monotonic()
+        held = now - self.scroll_time < cfg.scroll_repeat_window
+        if key == self.scroll_key and held:
+            self.scroll_repeats += 1
+        else:
+            self.scroll_repeats = 0
+        self.scroll_key = key
+        self.scroll_time = now
+        step = 1 + self.scroll_repeats // max(1, cfg.scroll_accel_presses)
+        return min(step, cfg.scroll_max_step)
+
+    def handle_key(self, key: KeyCode, step: int = 1):
+        """act on a key, scrolling step lines for up and down"""
+        if self.search_query is not None:
+            return self.handle_search_key(key, step)
+        if hasattr(key, 'char'):
+            if key.char == '/':
+                self.start_search()
+                return
+            elif key.char and key.char.isupper():
+                # shift + letter jumps to the first item starting with it
+                self.view.jump_to_letter(key.char)
+                return
+            elif key.char == 'd':
+                self.toggle_stats()
+                return
+            elif key.char == 's':
+                shuffled = self.player.toggle_shuffle()
+                self.view.notify(cfg.shuffle_strs[shuffled])
+                return
+            elif key.char == 'r':
+                repeat = self.player.cycle_repeat()
+                self.view.notify(cfg.repeat_strs[repeat])
+                return
+            elif key.char == 'p':
                 self.player.play()
             elif key.char == 'a':
                 self.player.pause()
@@ -217,7 +493,10 @@ class Controller:
                 self.player.skip_forward()
             elif key.char == 'l':
                 self.player.skip_back()
-            self.view.notify(self.player.get_state_str())
+            if self.player.failed:
+                self.view.notify(cfg.play_error_str)
+            else:
+                self.view.notify(self.player.get_state_str())
         else:
             if key == Key.left:
                 self.view.navigate_back()
@@ -225,36 +504,201 @@ class Controller:
             elif self.view.menu_stack[-1].items is None:
                 return
             elif key == Key.up:
-                self.view.navigate_up()
+                self.view.navigate_up(step)
             elif key == Key.down:
-                self.view.navigate_down()
+                self.view.navigate_down(step)
+            elif key == Key.page_up:
+                self.view.page_up()
+            elif key == Key.page_down:
+                self.view.page_down()
+            elif key == Key.home:
+                self.view.navigate_home()
+            elif key == Key.end:
+                self.view.navigate_end()
             elif key == Key.right:
                 return self.handle_select()
 
+    def update_scan_progress(self):
+        """report library scanning progress whenever it changes"""
+        progress = self.library.get_progress()
+        if progress == self.scan_progress:
+            return
+        self.scan_progress = progress
+        loading, scanned, total = progress
+        if loading:
+            self.view.notify(cfg.loading_str.format(scanned, total))
+        else:
+            elapsed = perf_counter() - self.start_time
+            stats.mark('startup.library', elapsed)
+            self.view.notify(cfg.loaded_str.format(elapsed))
+
+    def get_session(self) -> dict:
+        """return the state to restore at the next launch"""
+        metadata = self.player.get_metadata()
+        queue, _ = self.player.next_tracks.snapshot()
+        menus = [[display.menu_path, display.start_index + display.index]
+                 for display in self.view.menu_stack]
+        return {
+            'menus': menus,
+            'queue': queue,
+            'track': self.player.curr_track_path,
+            'time': metadata['curr_time'] if metadata else 0,
+            'shuffled': self.player.next_tracks.shuffled,
+            'repeat': int(self.player.repeat)
+        }
+
+    def restore_queue(self):
+        """restore the queue and playback modes from the last session. VLC
+        isn't needed, so this is done at once."""
+        queue = self.last_session.get('queue')
+        if isinstance(queue, list):
+            self.player.next_tracks.extend(queue)
+        if self.last_session.get('shuffled'):
+            self.player.next_tracks.set_shuffled(True)
+        try:
+            self.player.set_repeat(
+                RepeatMode(self.last_session.get('repeat', 0)))
+        except ValueError:
+            pass
+
+    def restore_menus(self, menus: list):
+        """reopen the menus left open last session, by selecting the item
+        each was opened from. stops short of option menus, and anything
+        else that would play or change something."""
+        for depth, (menu_path, position) in enumerate(menus):
+            display = self.view.menu_stack[-1]
+            # the menu may be gone, or be a directory no longer there
+            if display.menu_path != menu_path or display.items is None:
+                return
+            self.view.navigate_to(position)
+            if depth == len(menus) - 1:
+                return
+            item = self.view.menu_stack[-1].get_selected_item()
+            if item is None:
+                return
+            is_home = not menu_path
+            browses = item.item_type is ItemType.Directory or (
+                is_home and position not in (HomeOptions.SETTINGS,
+                                             HomeOptions.EXIT))
+            if not browses:
+                return
+            self.handle_select()
+
+    def restore_session(self):
+        """resume the last session's track once VLC is loaded, and reopen
+        its menus once the library is, unless a key was pressed first"""
+        track = self.last_session.get('track')
+        if track and self.player.ready.is_set():
+            self.last_session['track'] = None
+            self.player.resume(track, self.last_session.get('time') or 0)
+        menus = self.last_session.get('menus')
+        if menus and not self.library.get_progress()[0]:
+            self.last_session['menus'] = None
+            if not self.touched:
+                self.restore_menus(menus)
+
+    def update_startup(self):
+        """note how long VLC took to be ready after launch, or that it
+        couldn't be loaded"""
+        if 'startup.player' in stats.marks or not self.player.ready.is_set():
+            return
+        stats.mark('startup.player', perf_counter() - self.start_time)
+        if self.player.failed:
+            self.view.notify(cfg.vlc_error_str)
+
+    def toggle_stats(self):
+        """show or hide the stats overlay, collecting stats while shown"""
+        self.show_stats = not self.show_stats
+        if self.show_stats:
+            stats.enable()
+        else:
+            stats.enable(cfg.stats_enabled)
+            self.view.overlay = None
+
+    def update_art(self, metadata: dict):
+        """show the playing track's art once it has been rendered"""
+        lines = None
+        cols, rows = self.view.get_art_size()
+        path = self.player.curr_track_path
+        if rows and metadata and path:
+            lines = self.art.get(path, metadata, cols, rows)
+        self.view.update_art(lines)
+
+    @stats.timed('controller.tick')
     def tick(self):
         """periodic ui update"""
+        self.handle_commands()
+        if self.quitting:
+            return
+        self.update_scan_progress()
+        self.update_startup()
+        if self.last_session:
+            self.restore_session()
+        if self.player.advance():
+            self.view.notify(self.player.get_state_str())
         metadata = self.player.get_metadata()
         display = self.view.menu_stack[-1]
-        if display.menu_path == cfg.home_menu_items[HomeOptions.QUEUE]:
-            display_items = []
-            for item in self.player.next_tracks:
-                display_items.append(DisplayItem(ItemType.Track, item))
-            new_display = display._replace(items=display_items)
-            self.view.menu_stack.pop()
-            self.view.menu_stack.append(new_display)
+        queue_path = cfg.home_menu_items[HomeOptions.QUEUE]
+        if display.menu_path == queue_path and self.search_query is None:
+            self.update_queue_display()
+        if self.show_stats:
+            self.view.overlay = stats.get_summary()
         self.view.update_status(metadata)
         self.view.update_menu()
-        self.view.screen.refresh()
+        if self.art:
+            self.update_art(metadata)
+        self.view.refresh()
+
+    def get_timeout(self):
+        """seconds the main loop may sleep without an event, or None to sleep
+        until one arrives"""
+        loading = self.scan_progress is None or self.scan_progress[0]
+        if loading:
+            return cfg.scan_refresh_rate
+        return None
+
+    def on_resize(self, signum, frame):
+        """wake the main loop to repaint, even while idle"""
+        self.wake.set()
+
+    def handle_resizes(self):
+        """call on_resize when the terminal is resized, returning the handler
+        it replaced. signals can only be handled on the main thread, and not
+        at all on windows, in which case this returns None."""
+        if not hasattr(signal, 'SIGWINCH'):
+            return None
+        if threading.current_thread() is not threading.main_thread():
+            return None
+        old_handler = signal.signal(signal.SIGWINCH, self.on_resize)
+        # a handler set by curses itself can't be put back from python
+        return signal.SIG_DFL if old_handler is None else old_handler
 
     def run(self):
-        """splits into two threads for ui and pynput"""
+        """splits into two threads for ui and pynput. the ui thread sleeps
+        until woken by a keypress or player event, then acts on queued keys
+        in a batch and draws one frame."""
         listener = Listener(on_press=self.on_press)
+        old_handler = None
         try:
             listener.start()
-            while listener.running:
+            old_handler = self.handle_resizes()
+            while listener.running and not self.quitting:
+                self.wake.clear()
                 self.tick()
-                sleep(cfg.refresh_rate)
+                self.wake.wait(self.get_timeout())
         finally:
+            listener.stop()
+            if old_handler is not None:
+                signal.signal(signal.SIGWINCH, old_handler)
+            try:
+                session.save(cfg.session_path, self.get_session())
+            except OSError:
+                pass
+            if stats.stages:
+                try:
+                    stats.dump(cfg.stats_path)
+                except OSError:
+                    pass
             del self.view
             del self.player
             del self.library
@@ -0,0 +1,71 @@
+"""recently played tracks, kept across restarts.
+
+plays are appended to a log, one path per line, so recording one is a
+single small write. the log is rewritten with just the tracks still held
+once it grows to twice the history's size, keeping it bounded on disk as
+the history is in memory."""
+import threading
+from collections import deque
+
+import atomic
+
+
+class History:
+    """the last max_size tracks played, oldest first"""
+
+    def __init__(self, log_path: str, max_size: int):
+        self.log_path = log_path
+        self.max_size = max(1, max_size)
+        # older tracks fall off the far end as new ones are recorded
+        self.tracks = deque(maxlen=self.max_size)
+        # lines in the log, including those no longer held
+        self.log_lines = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def load(self):
+        try:
+            with open(self.log_path, encoding='utf-8') as log_file:
+                for line in log_file:
+                    path = line.rstrip('\n')
+                    if path:
+                        self.tracks.append(path)
+                    self.log_lines += 1
+        except (OSError, UnicodeDecodeError):
+            return
+        if self.log_lines >= self.max_size * 2:
+            self.compact()
+
+    def record(self, path: str):
+        """add a played track, appending it to the log"""
+        if '\n' in path:
+            return
+        with self.lock:
+            self.tracks.append(path)
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as log_file:
+                    log_file.write(path + '\n')
+            except OSError:
+                return
+            self.log_lines += 1
+            compact = self.log_lines >= self.max_size * 2
+        if compact:
+            self.compact()
+
+    def compact(self):
+        """rewrite the log with only the tracks still held"""
+        with self.lock:
+            try:
+                with atomic.write_file(self.log_path) as log_file:
+                    log_file.writelines(path + '\n' for path in self.tracks)
+            except OSError:
+                return
+            self.log_lines = len(self.tracks)
+
+    def get_recent(self) -> list:
+        """return the tracks played, most recent first"""
+        with self.lock:
+            return list(reversed(self.tracks))
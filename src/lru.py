@@ -0,0 +1,43 @@
+"""a small, thread-safe least-recently-used cache"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """map keys to values, evicting the least recently used entry once more
+    than max_size are held"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key) -> bool:
+        with self.lock:
+            return key in self.items
+
+    def get(self, key, default=None):
+        """return the value for key, marking it as most recently used"""
+        with self.lock:
+            if key not in self.items:
+                return default
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self.lock:
+            return self.items.pop(key, default)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
@@ -1,8 +1,19 @@
-from controller import Controller
+from time import perf_counter
+start_time = perf_counter()
+
+import stats  # noqa: E402
+from view import View  # noqa: E402
 
 
 def main():
-    controller = Controller()
+    # draw before importing the controller, which brings in pynput, and
+    # through the model, everything else
+    view = View()
+    view.update_menu()
+    view.refresh()
+    stats.mark('startup.first_frame', perf_counter() - start_time)
+    from controller import Controller
+    controller = Controller(view, start_time)
     controller.run()
 
 
@@ -1,83 +1,512 @@
 import os
-import vlc
-from glob import glob
-from collections import deque, defaultdict
-from mutagen.easyid3 import EasyID3 as get_tags
-
-from view import DisplayItem, ItemType
+import re
+import random
+import importlib
+import threading
+from array import array
+from enum import IntEnum
+from itertools import product
+from collections import deque
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                as_completed)
+
+from view import DisplayItem, ItemType, LazyItems
+from tags import read_tags, get_name_tags, pack, unpack, TAG_KEYS
+from tracks import TrackTable, PathView
+from browse import BrowseIndex
+from lru import LRUCache
+from search import SearchIndex, natural_key
+from history import History
+import playlist
+import stats
+import cache
 import cfg
 
+# sorts tracks without a track number after those with one
+_no_track_number = 0xFFFFFFFF
+_track_number_pattern = re.compile(r'\d+')
+
+# imported by Player.load, since loading libvlc is slow on small boards
+vlc = None
+
+
+def _import_vlc():
+    global vlc
+    if vlc is None:
+        vlc = importlib.import_module('vlc')
+
+
+def _read_batch(batch: list) -> list:
+    """read tags for a list of (path, size, mtime) in a worker"""
+    records = list()
+    for path, size, mtime in batch:
+        try:
+            tags = pack(read_tags(path))
+        except Exception:
+            # anything mutagen didn't expect from one file shouldn't end
+            # the scan; it's indexed by name instead
+            tags = pack(get_name_tags(path))
+        records.append((path, cache.TrackRecord(size, mtime, tags)))
+    return records
+
 
 class Library:
-    """handle media. uses deques for fast manipulation from both sides"""
+    """handle media. tracks are stored once in a table and the browse indexes
+    map tag values to arrays of track ids. the library is scanned on a
+    background thread; readers should go through the accessors below, which
+    hold the lock while indexes are growing."""
 
     def __init__(self):
-        self.tracks = deque()
+        self.lock = threading.Lock()
+        self.loading = False
+        self.scan_total = 0
+        self.tracks = TrackTable()
         self.last_played = deque()
-        for ext in cfg.music_formats:
-            file = os.path.join(cfg.music_dir, '**', '*' + ext)
-            self.tracks.extend(glob(file))
-        self.artists: dict = self.get_metadata_dict('artist')
-        self.albums: dict = self.get_metadata_dict('album')
-        self.years: dict = self.get_metadata_dict('year')
-        self.genres: dict = self.get_metadata_dict('genre')
-
-    def get_metadata_dict(self, key: str) -> dict:
-        results = defaultdict(list)
-        for track in self.tracks:
-            metadata = get_tags(track)
-            tag_list = metadata.get(key)
-            if not tag_list:
-                continue
-            for tag in tag_list:
-                results[tag].append(track)
-        return results
+        # the number of each track on its album, by track id
+        self.track_numbers = array('I')
+        # browse indexes, sharing collation keys for the values they file by
+        self.collation = collation = dict()
+        self.artists = BrowseIndex(('artist', 'album'), collation,
+                                   self._get_track_order)
+        self.albums = BrowseIndex(('album',), collation,
+                                  self._get_track_order)
+        self.years = BrowseIndex(('year', 'album'), collation,
+                                 self._get_track_order)
+        self.genres = BrowseIndex(('genre',), collation)
+        # word prefix indexes over track ids by title, and browse index keys
+        self.search_indexes = {key: SearchIndex() for key in
+                               ('title', 'artist', 'album', 'genre')}
+        # tags for tracks outside the scanned library, e.g. from playlists
+        self.tag_cache = LRUCache(cfg.tag_cache_size)
+        # directory listings keyed by path, as (modification time, items)
+        self.dir_cache = LRUCache(cfg.dir_cache_size)
+
+    @staticmethod
+    def _find_tracks(root: str):
+        """yield (path, stat) for every music file beneath root"""
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
+            return
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir():
+                yield from Library._find_tracks(entry.path)
+            elif os.path.splitext(entry.name)[1] in cfg.music_formats:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # a dangling link, or a file deleted since listed
+                    continue
+                yield entry.path, stat
+
+    @staticmethod
+    def _read_records(stale: list):
+        """read tags across a worker pool, yielding (path, record) pairs as
+        each batch completes"""
+        if not stale:
+            return
+        if cfg.scan_use_processes:
+            pool = ProcessPoolExecutor(max_workers=cfg.scan_workers)
+        else:
+            pool = ThreadPoolExecutor(max_workers=cfg.scan_workers)
+        size = max(1, cfg.scan_batch_size)
+        with pool:
+            futures = [pool.submit(_read_batch, stale[i:i + size])
+                       for i in range(0, len(stale), size)]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def start_scan(self):
+        """scan the library on a background thread"""
+        with self.lock:
+            if self.loading:
+                return
+            self.loading = True
+        scanner = threading.Thread(target=self.scan, daemon=True)
+        scanner.start()
+
+    def get_progress(self) -> tuple:
+        """return whether a scan is running, and tracks scanned out of total"""
+        with self.lock:
+            return self.loading, len(self.tracks), self.scan_total
+
+    @stats.timed('library.scan')
+    def scan(self):
+        """load the cached index, re-reading tags only for new or changed
+        files. deleted files are dropped. the cache is rewritten if needed.
+        tracks are added to the browse indexes as soon as they're known."""
+        with self.lock:
+            self.loading = True
+        try:
+            self._scan()
+        finally:
+            with self.lock:
+                self.loading = False
+
+    def _scan(self):
+        cached = cache.load(cfg.library_cache_path, cfg.music_dir)
+        found = list(self._find_tracks(cfg.music_dir))
+        with self.lock:
+            self.scan_total = len(found)
+        stale = list()
+        for path, stat in found:
+            record = cached.get(path)
+            if cache.is_stale(record, stat):
+                stale.append((path, stat.st_size, stat.st_mtime_ns))
+            else:
+                self.add_track(path, record)
+
+        for path, record in self._read_records(stale):
+            self.add_track(path, record)
+
+        # sort the indexes now, rather than on first browse. the lock is let
+        # go between them so the ui isn't held up for long
+        for index in self.get_indexes():
+            with self.lock:
+                index.finish()
+
+        if stale or len(self.tracks) != len(cached):
+            with self.lock:
+                records = self.tracks.get_records()
+            try:
+                cache.save(cfg.library_cache_path, cfg.music_dir, records)
+            except OSError:
+                pass  # read-only media; rescan next time
+
+    @stats.timed('library.add_track')
+    def add_track(self, path: str, record: cache.TrackRecord):
+        """file a track under every browse index from one tag record"""
+        with self.lock:
+            if path in self.tracks:
+                return
+            track_id = self.tracks.add(path, record)
+            tags = self.tracks.tags[track_id]
+            self.track_numbers.append(self._parse_track_number(tags))
+            for index in self.get_indexes():
+                search_index = self.search_indexes.get(index.levels[0])
+                for keys in self._get_browse_keys(tags, index.levels):
+                    if search_index is not None and keys[0] not in index:
+                        search_index.add(keys[0], keys[0])
+                    index.add(keys, track_id)
+            name = ' '.join(tags[TAG_KEYS.index('title')])
+            name += ' ' + os.path.splitext(os.path.basename(path))[0]
+            self.search_indexes['title'].add(track_id, name)
+
+    @staticmethod
+    def _parse_track_number(tags: tuple) -> int:
+        """read a number like '3' or '3/12', or a default sorting last"""
+        for value in tags[TAG_KEYS.index('tracknumber')]:
+            match = _track_number_pattern.match(value.strip())
+            if match:
+                return min(int(match.group()), _no_track_number - 1)
+        return _no_track_number
+
+    @staticmethod
+    def _get_browse_keys(tags: tuple, levels: tuple):
+        """yield the key paths to file a track under. tracks missing the
+        first level's tag aren't filed; lower levels fall back to unknown"""
+        values = list()
+        for depth, key in enumerate(levels):
+            level_values = tags[TAG_KEYS.index(key)]
+            if not level_values:
+                if not depth:
+                    return
+                level_values = (cfg.unknown_str,)
+            values.append(level_values)
+        yield from product(*values)
+
+    def _get_track_order(self, track_id: int) -> tuple:
+        """album order, with ties left in the order scanned"""
+        return self.track_numbers[track_id], track_id
+
+    def get_indexes(self) -> tuple:
+        return self.artists, self.albums, self.years, self.genres
+
+    def get_keys(self, index: BrowseIndex, keys: tuple = ()) -> list:
+        """return the sorted keys below a path in a browse index"""
+        with self.lock:
+            return index.get_keys(keys)
+
+    def get_subset(self, index: BrowseIndex, keys: tuple) -> PathView:
+        """return the tracks filed under a path in a browse index, sorted"""
+        with self.lock:
+            return PathView(self.tracks.paths, index.get_tracks(keys))
+
+    def search(self, key: str, query: str) -> list:
+        """return track paths if key is 'title', otherwise keys of the browse
+        index for key, whose names match every word of query. keys are in
+        the browse menu's order."""
+        with self.lock:
+            results = self.search_indexes[key].search(query)
+            if key == 'title':
+                return PathView(self.tracks.paths, results)
+            return sorted(results, key=self.collation.__getitem__)
+
+    def get_track_tags(self, path: str) -> dict:
+        """return a track's tags from the index if scanned, otherwise from
+        the tag cache, reading the file only on a miss"""
+        with self.lock:
+            track_id = self.tracks.ids.get(path)
+            if track_id is not None:
+                return unpack(self.tracks.tags[track_id])
+        tags = self.tag_cache.get(path)
+        if tags is None:
+            tags = read_tags(path)
+            self.tag_cache.put(path, tags)
+        return tags
 
     def get_tracks(self) -> list:
-        return [DisplayItem(ItemType.Track, path) for path in self.tracks]
+        with self.lock:
+            all_tracks = range(len(self.tracks))
+            return LazyItems(ItemType.Track, PathView(self.tracks.paths,
+                                                      all_tracks))
 
     def get_disk_items(self, root: str) -> list:
-        """return a tuple list of items, their paths, & their type"""
-        items = list()
-
-        if not os.path.isdir(root):
+        """return a tuple list of items, their paths, & their type. listings
+        are sorted naturally, directories first, and cached until the
+        directory's modification time changes."""
+        try:
+            mtime = os.stat(root).st_mtime_ns
+        except OSError:
+            return None
+        cached = self.dir_cache.get(root)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        dirs = list()
+        files = list()
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
             return None
-        for item in os.listdir(root):
-            abs_path = os.path.join(root, item)
-            ext = os.path.splitext(abs_path)[-1]
-            if os.path.isdir(abs_path):
-                items.append(DisplayItem(ItemType.Directory, abs_path))
+        for entry in entries:
+            ext = os.path.splitext(entry.name)[-1]
+            # is_dir uses the type scandir already read; no extra stat
+            if entry.is_dir():
+                dirs.append(DisplayItem(ItemType.Directory, entry.path))
             elif not ext:
                 continue
             elif ext in cfg.music_formats:
-                items.append(DisplayItem(ItemType.Track, abs_path))
+                files.append(DisplayItem(ItemType.Track, entry.path))
             elif ext in cfg.playlist_formats:
-                items.append(DisplayItem(ItemType.Playlist, abs_path))
+                files.append(DisplayItem(ItemType.Playlist, entry.path))
+
+        def get_key(item):
+            return natural_key(os.path.basename(item.path))
+        items = sorted(dirs, key=get_key) + sorted(files, key=get_key)
+        self.dir_cache.put(root, (mtime, items))
         return items
 
+    @staticmethod
+    def get_playlist_entries(playlist_path: str) -> list:
+        """given a valid playlist path, return its parsed entries"""
+        return playlist.get_entries(playlist_path)
+
     @staticmethod
     def get_playlist_tracks(playlist_path: str) -> list:
         """given a valid playlist path, return contained track paths as list"""
-        tracks = list()
-        with open(playlist_path, 'r') as playlist:
-            for line in playlist:
-                tracks.append(line.rstrip())
-        return tracks
+        return [entry.path for entry in playlist.get_entries(playlist_path)]
+
+
+class RepeatMode(IntEnum):
+    """what to play once the queue runs out, or a track ends"""
+    OFF = 0
+    ALL = 1
+    ONE = 2
+
+
+class TrackQueue:
+    """track paths waiting to be played. every change bumps version, so views
+    can tell when they're out of date without comparing contents.
+
+    when shuffled, the next track is drawn at random as it's needed, by
+    swapping it to the front. this is fisher-yates done one step at a time,
+    so shuffling costs nothing up front and no track is drawn twice."""
+
+    def __init__(self):
+        self.tracks = deque()
+        self.version = 0
+        self.lock = threading.Lock()
+        self.shuffled = False
+        # true once the front track is settled, whether drawn at random or
+        # put there by the user
+        self.pinned = False
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def __getitem__(self, index: int) -> str:
+        with self.lock:
+            return self.tracks[index]
+
+    def _changed(self):
+        self.version += 1
+
+    def _draw(self):
+        """swap a random track to the front, unless it's pinned there"""
+        if not self.shuffled or self.pinned or not self.tracks:
+            return
+        drawn = random.randrange(len(self.tracks))
+        if drawn:
+            self.tracks[0], self.tracks[drawn] = (self.tracks[drawn],
+                                                  self.tracks[0])
+            self._changed()
+        self.pinned = True
+
+    def set_shuffled(self, shuffled: bool):
+        with self.lock:
+            self.shuffled = shuffled
+            self.pinned = False
+            self._changed()
+
+    def peek(self) -> str:
+        """return the track that will be played next"""
+        with self.lock:
+            self._draw()
+            return self.tracks[0]
+
+    def snapshot(self) -> tuple:
+        """return the queued paths as a list, along with their version"""
+        with self.lock:
+            return list(self.tracks), self.version
+
+    def index(self, path: str) -> int:
+        with self.lock:
+            return self.tracks.index(path)
+
+    def append(self, path: str):
+        with self.lock:
+            self.tracks.append(path)
+            self._changed()
+
+    def appendleft(self, path: str):
+        with self.lock:
+            self.tracks.appendleft(path)
+            self.pinned = True
+            self._changed()
+
+    def extend(self, paths: list):
+        with self.lock:
+            self.tracks.extend(paths)
+            self._changed()
+
+    def extendleft(self, paths: list):
+        with self.lock:
+            self.tracks.extendleft(paths)
+            self.pinned = True
+            self._changed()
+
+    def popleft(self) -> str:
+        with self.lock:
+            self._draw()
+            self.pinned = False
+            self._changed()
+            return self.tracks.popleft()
+
+    def clear(self):
+        with self.lock:
+            self.tracks.clear()
+            self.pinned = False
+            self._changed()
+
+    def remove(self, index: int):
+        """drop the track at index, if it's still in the queue"""
+        with self.lock:
+            if not 0 <= index < len(self.tracks):
+                return
+            del self.tracks[index]
+            if index == 0:
+                self.pinned = False
+            self._changed()
+
+    def move(self, index: int, new_index: int):
+        """move the track at index to new_index, clamped to the queue. does
+        nothing if index is no longer in the queue"""
+        with self.lock:
+            if not 0 <= index < len(self.tracks):
+                return
+            new_index = max(0, min(new_index, len(self.tracks) - 1))
+            if new_index == index:
+                return
+            path = self.tracks[index]
+            del self.tracks[index]
+            self.tracks.insert(new_index, path)
+            if new_index == 0:
+                self.pinned = True
+            elif index == 0:
+                self.pinned = False
+            self._changed()
 
 
 class Player:
     """track player state and wrap calls to VLC"""
 
-    def __init__(self, library: Library):
-        self.next_tracks = deque()
-        self.last_tracks = deque()
+    def __init__(self, library: Library, on_change=None):
+        self.next_tracks = TrackQueue()
+        # tracks to skip back to, and those played across sessions
+        self.last_tracks = deque(maxlen=cfg.history_size)
+        self.history = History(cfg.history_path, cfg.history_size)
+        self.repeat = RepeatMode.OFF
+        # tracks played since the queue was last filled, to refill it from.
+        # only kept while repeating all.
+        self.cycle = list()
         self.library = library
-        self.curr_track: vlc.MediaPlayer = None
+        # called from VLC's event thread whenever the ui needs a redraw
+        self.on_change = on_change
+        self.last_progress_step = None
+        # set on VLC's thread when a track finishes, or fails to play;
+        # handled by advance()
+        self.track_ended = False
+        self.track_failed = False
+        # one instance and player for the whole session, made by load. tracks
+        # are swapped in as media, keeping the audio output open between them.
+        self.instance: 'vlc.Instance' = None
+        self.media_player: 'vlc.MediaPlayer' = None
+        # set once load is done, whether or not VLC could be loaded
+        self.ready = threading.Event()
+        # true if load failed, in which case nothing can be played
+        self.failed = False
+        # parsed media by path, for recent tracks and the head of next_tracks
+        self.media_cache = LRUCache(cfg.media_cache_size)
+        # the media player, once a track has been opened in it
+        self.curr_track: 'vlc.MediaPlayer' = None
         self.curr_track_path: str = None
+        self.curr_metadata: dict = None
+        # where the current track was resumed from, until it plays
+        self.start_seconds = 0
 
     def __del__(self):
         self.stop()
 
+    def load(self):
+        """import VLC and open the player. ready is set even if this fails,
+        so nothing is left waiting on VLC"""
+        try:
+            _import_vlc()
+            self.instance = vlc.Instance()
+            self.media_player = self._new_media_player()
+        except Exception:
+            # anything from a missing or mismatched libvlc, which would
+            # otherwise only be reported on this thread's stderr
+            self.failed = True
+        self.ready.set()
+        if self.failed:
+            self._notify_change()
+            return
+        # anything queued meanwhile wasn't prebuffered
+        self._prebuffer()
+        self._notify_change()
+
+    def wait_ready(self) -> bool:
+        """wait for load to finish, returning true if VLC can be used"""
+        self.ready.wait()
+        return not self.failed
+
+    def start_loading(self):
+        """load VLC in the background, so the ui can start without it"""
+        loader = threading.Thread(target=self.load, daemon=True)
+        loader.start()
+
     def get_state_str(self) -> str:
         if not self.curr_track:
             return cfg.no_media_str
@@ -90,20 +519,22 @@ class Player:
             return cfg.ended_str
         return cfg.no_media_str
 
+    @stats.timed('player.get_metadata')
     def get_metadata(self) -> dict:
-        """return a dictionary of current track's metadata"""
+        """return a dictionary of current track's metadata. tags are read
+        once per track; only the playback position is queried each call"""
         if self.curr_track is None:
             return None
 
-        metadata = get_tags(self.curr_track_path)
+        metadata = self.curr_metadata
         if not metadata:
             return None
 
         run_time = self.curr_track.get_length()
         run_time = 0 if run_time < 0 else run_time / 1000   # millisec to sec
         curr_time = self.curr_track.get_time() / 1000       # millisec to sec
-        if curr_time < 0:
-            curr_time = 0
+        if curr_time <= 0:
+            curr_time = self.start_seconds
         return {'playing': self.curr_track.is_playing(),
                 'title': metadata.get('title'),
                 'artist': metadata.get('artist'),
@@ -111,9 +542,94 @@ class Player:
                 'curr_time': curr_time,
                 'run_time': run_time}
 
+    def _notify_change(self, event=None):
+        if self.on_change is not None:
+            self.on_change()
+
+    def _on_time_changed(self, event):
+        """wake the ui once per progress step of playback time"""
+        step = event.u.new_time // int(cfg.progress_refresh_rate * 1000 or 1)
+        if step != self.last_progress_step:
+            self.last_progress_step = step
+            self._notify_change()
+
+    def _on_end_reached(self, event):
+        self.track_ended = True
+        self._notify_change()
+
+    def _on_error(self, event):
+        """a track that can't be opened is passed over like one that ended"""
+        self.track_failed = True
+        self._on_end_reached(event)
+
+    def _get_media(self, path: str) -> 'vlc.Media':
+        """return media for path, parsing it in the background on first use.
+        returns None if VLC couldn't be loaded"""
+        if not self.wait_ready():
+            return None
+        media = self.media_cache.get(path)
+        if media is None:
+            media = self.instance.media_new(path)
+            media.parse_with_options(vlc.MediaParseFlag.local, 0)
+            self.media_cache.put(path, media)
+        return media
+
+    def _prebuffer(self):
+        """parse the next queued track in the background while this one plays"""
+        if self.next_tracks and self.ready.is_set() and not self.failed:
+            self._get_media(self.next_tracks.peek())
+
+    def _new_media_player(self) -> 'vlc.MediaPlayer':
+        """create a player that reports its events to on_change. callbacks
+        run on VLC's thread and must not call back into VLC."""
+        player = self.instance.media_player_new()
+        events = player.event_manager()
+        events.event_attach(vlc.EventType.MediaPlayerTimeChanged,
+                            self._on_time_changed)
+        events.event_attach(vlc.EventType.MediaPlayerEndReached,
+                            self._on_end_reached)
+        events.event_attach(vlc.EventType.MediaPlayerEncounteredError,
+                            self._on_error)
+        for event_type in (vlc.EventType.MediaPlayerPlaying,
+                           vlc.EventType.MediaPlayerPaused,
+                           vlc.EventType.MediaPlayerStopped):
+            events.event_attach(event_type, self._notify_change)
+        return player
+
+    def _open_track(self, path: str, media: 'vlc.Media' = None):
+        """load a track into the player, along with its tags"""
+        self.track_ended = False
+        self.track_failed = False
+        self.curr_track_path = path
+        self.start_seconds = 0
+        if media is None:
+            media = self._get_media(path)
+        self.media_player.set_media(media)
+        self.curr_track = self.media_player
+        self.curr_metadata = self.library.get_track_tags(path)
+        self._prebuffer()
+
+    def advance(self) -> bool:
+        """start the next queued track once the current one has ended. VLC
+        can't be driven from its own event thread, so the end is only flagged
+        there and handled here. returns true if the current track ended"""
+        if not self.track_ended:
+            return False
+        self.track_ended = False
+        if self.track_failed:
+            # parsed again if it's ever retried
+            self.media_cache.pop(self.curr_track_path)
+        if self.repeat == RepeatMode.ONE and not self.track_failed:
+            self.restart_track()
+        else:
+            self.play_next_track()
+        return True
+
     def restart_track(self):
         self.curr_track.stop()
-        self.curr_track = vlc.MediaPlayer(self.curr_track_path)
+        self.start_seconds = 0
+        # an ended player needs its media set again to replay it
+        self.curr_track.set_media(self._get_media(self.curr_track_path))
         self.play()
 
     def play_current_track(self) -> bool:
@@ -125,14 +641,33 @@ class Player:
             return True
         return False
 
+    def _add_played(self, path: str):
+        self.last_tracks.appendleft(path)
+        self.history.record(path)
+
+    def _pop_next(self) -> str:
+        """take the next track from the queue, refilling it with this pass's
+        tracks if it's empty and repeating all. returns None if empty"""
+        if not self.next_tracks and self.repeat == RepeatMode.ALL:
+            # a track put back by skipping back is only replayed once
+            self.next_tracks.extend(dict.fromkeys(self.cycle))
+            self.cycle = list()
+        if not self.next_tracks:
+            return None
+        up_next = self.next_tracks.popleft()
+        if self.repeat == RepeatMode.ALL:
+            self.cycle.append(up_next)
+        return up_next
+
     def play_next_track(self) -> bool:
-        if len(self.next_tracks) <= 0:
+        if not self.wait_ready():
+            return False
+        up_next = self._pop_next()
+        if up_next is None:
             return False
         self.stop()
-        up_next = self.next_tracks.popleft()
-        self.last_tracks.appendleft(up_next)
-        self.curr_track = vlc.MediaPlayer(up_next)
-        self.curr_track_path = up_next
+        self._add_played(up_next)
+        self._open_track(up_next)
         return self.curr_track.play() >= 0
 
     def play(self, media=None) -> bool:
@@ -158,6 +693,7 @@ class Player:
 
         self.next_tracks.clear()
         self.next_tracks.extend(track_list)
+        self.cycle = list()
         return self.play_next_track()
 
     def pause(self):
@@ -178,6 +714,7 @@ class Player:
             self.next_tracks.extendleft(item)
         else:
             self.next_tracks.appendleft(item)
+        self._prebuffer()
 
     def queue_last(self, item):
         """add a plain list track paths to the end of the deque"""
@@ -187,23 +724,78 @@ class Player:
             self.next_tracks.extend(item)
         else:
             self.next_tracks.append(item)
+        self._prebuffer()
+
+    def remove_queued(self, index: int):
+        self.next_tracks.remove(index)
+        self._prebuffer()
+
+    def move_queued(self, index: int, new_index: int):
+        self.next_tracks.move(index, new_index)
+        self._prebuffer()
+
+    def clear_queue(self):
+        self.next_tracks.clear()
+        self._prebuffer()
+
+    def resume(self, path: str, seconds: float) -> bool:
+        """open path paused at seconds, as it was left last session. returns
+        false if it couldn't be opened"""
+        if not os.path.isfile(path):
+            return False
+        if not self.wait_ready():
+            return False
+        # not cached, so replaying the track starts from the beginning
+        media = self.instance.media_new(path)
+        media.add_option(':start-time=%.1f' % seconds)
+        self._open_track(path, media)
+        self.start_seconds = seconds
+        self.last_tracks.appendleft(path)
+        if self.repeat == RepeatMode.ALL:
+            self.cycle.append(path)
+        return True
+
+    def toggle_shuffle(self) -> bool:
+        """shuffle or unshuffle the queue, returning true if now shuffled"""
+        self.next_tracks.set_shuffled(not self.next_tracks.shuffled)
+        self._prebuffer()
+        return self.next_tracks.shuffled
+
+    def cycle_repeat(self) -> RepeatMode:
+        """step to the next repeat mode, returning it"""
+        self.set_repeat(RepeatMode((self.repeat + 1) % len(RepeatMode)))
+        return self.repeat
+
+    def set_repeat(self, repeat: RepeatMode):
+        """change the repeat mode. repeating all starts its pass from the
+        current track"""
+        if repeat == RepeatMode.ALL and self.repeat != RepeatMode.ALL:
+            self.cycle = list()
+            if self.curr_track_path:
+                self.cycle.append(self.curr_track_path)
+        elif repeat != RepeatMode.ALL:
+            self.cycle = list()
+        self.repeat = repeat
 
     def skip_forward(self):
         """skip the the beginning of the next track"""
-        if len(self.next_tracks) <= 0:
+        if not self.wait_ready():
+            return
+        track_path = self._pop_next()
+        if track_path is None:
             return
         self.stop()
 
-        track_path = self.next_tracks.popleft()
         if not os.path.isfile(track_path):
             return
-        self.curr_track_path = track_path
-        self.curr_track = vlc.MediaPlayer(track_path)
-        self.last_tracks.appendleft(track_path)
+        self._open_track(track_path)
+        self._add_played(track_path)
         self.play()
 
     def skip_back(self):
         """skip to the beginning of the last track"""
+        if not self.wait_ready():
+            return
         metadata = self.get_metadata()
         if metadata:
             if metadata['run_time'] <= cfg.skip_back_threshold:
@@ -217,7 +809,6 @@ class Player:
         track_path = self.last_tracks.popleft()
         if not os.path.isfile(track_path):
             return
-        self.curr_track_path = track_path
-        self.curr_track = vlc.MediaPlayer(track_path)
+        self._open_track(track_path)
         self.next_tracks.appendleft(track_path)
         self.play()
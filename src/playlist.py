@@ -0,0 +1,83 @@
+"""parse .m3u and .m3u8 playlists, caching results until the file changes"""
+import os
+from typing import NamedTuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from lru import LRUCache
+import cfg
+
+_extinf = '#EXTINF:'
+
+
+class PlaylistEntry(NamedTuple):
+    path: str
+    title: str = None  # from #EXTINF, if given
+    duration: int = -1  # in seconds, from #EXTINF; -1 if unknown
+
+
+def _read_lines(playlist_path: str) -> list:
+    """m3u8 is always utf-8. plain m3u is usually utf-8 too, but older
+    players wrote it in a legacy encoding, read here as latin-1"""
+    with open(playlist_path, 'rb') as playlist:
+        data = playlist.read()
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        if playlist_path.lower().endswith('.m3u8'):
+            text = data.decode('utf-8-sig', errors='replace')
+        else:
+            text = data.decode('latin-1')
+    return text.splitlines()
+
+
+def _parse_extinf(line: str) -> tuple:
+    """split '#EXTINF:123,Artist - Title' into (123, 'Artist - Title')"""
+    info = line[len(_extinf):]
+    duration, _, title = info.partition(',')
+    # attributes may follow the duration, e.g. '-1 tvg-id="x",Title'
+    duration = duration.strip().split(' ')[0]
+    try:
+        duration = int(float(duration))
+    except ValueError:
+        duration = -1
+    return duration, title.strip() or None
+
+
+def parse(playlist_path: str) -> list:
+    """return a list of PlaylistEntry. relative paths are resolved against
+    the playlist's directory; comments and blank lines are skipped."""
+    playlist_dir = os.path.dirname(os.path.abspath(playlist_path))
+    entries = list()
+    duration, title = -1, None
+    for line in _read_lines(playlist_path):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(_extinf):
+            duration, title = _parse_extinf(line)
+            continue
+        if line.startswith('#'):
+            continue
+        if line.startswith('file://'):
+            # e.g. file:///music/My%20Song.mp3, as exported by VLC
+            line = url2pathname(urlparse(line).path)
+        path = os.path.normpath(os.path.join(playlist_dir, line))
+        entries.append(PlaylistEntry(path, title, duration))
+        duration, title = -1, None
+    return entries
+
+
+# parsed playlists keyed by path, as (modification time, entries)
+_parsed = LRUCache(cfg.playlist_cache_size)
+
+
+def get_entries(playlist_path: str) -> list:
+    """return a playlist's entries, parsing it only if it's new or changed"""
+    mtime = os.stat(playlist_path).st_mtime_ns
+    cached = _parsed.get(playlist_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    entries = parse(playlist_path)
+    _parsed.put(playlist_path, (mtime, entries))
+    return entries
@@ -0,0 +1,104 @@
+"""case and diacritic insensitive search by word prefixes"""
+import re
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+_word_pattern = re.compile(r'\w+')
+_digits_pattern = re.compile(r'(\d+)')
+
+
+def fold(text: str) -> str:
+    """lowercase text and strip accents, so 'Björk' and 'bjork' compare equal"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.casefold()
+
+
+def natural_key(text: str) -> tuple:
+    """a sort key that orders folded text with embedded numbers by value,
+    so 'track 2' sorts before 'track 10'"""
+    parts = _digits_pattern.split(fold(text))
+    # split alternates text and digits, so like types are always compared
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts))
+
+
+def get_words(text: str) -> list:
+    return _word_pattern.findall(fold(text))
+
+
+def _matches(query_words: list, name_words: list) -> bool:
+    """true if every query word starts some word of the name"""
+    for query_word in query_words:
+        if not any(word.startswith(query_word) for word in name_words):
+            return False
+    return True
+
+
+def filter_items(items, query: str) -> list:
+    """return the display items whose names match query, by linear scan.
+    meant for menus that aren't backed by a SearchIndex."""
+    query_words = get_words(query)
+    results = list()
+    for item in items:
+        if _matches(query_words, get_words(item.get_name())):
+            results.append(item)
+    return results
+
+
+class SearchIndex:
+    """find values by word prefixes of their names. every word of every name
+    is kept in one sorted list, so a prefix lookup is a bisection followed by
+    a scan over just the matching words. names may be added at any time; the
+    list is re-sorted on the next search. words are interned and paired with
+    value indices in a parallel array, keeping the index compact."""
+
+    def __init__(self):
+        self.values = list()
+        self.words = list()  # folded words
+        self.word_values = array('I')  # index of each word's value
+        self.is_sorted = True
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value, name: str):
+        value_index = len(self.values)
+        self.values.append(value)
+        for word in set(get_words(name)):
+            self.words.append(sys.intern(word))
+            self.word_values.append(value_index)
+        self.is_sorted = False
+
+    def _sort(self):
+        order = sorted(range(len(self.words)), key=self.words.__getitem__)
+        self.words = [self.words[i] for i in order]
+        self.word_values = array('I', (self.word_values[i] for i in order))
+        self.is_sorted = True
+
+    def _find_prefix(self, prefix: str) -> set:
+        """return the indices of values with a word starting with prefix"""
+        found = set()
+        position = bisect_left(self.words, prefix)
+        while position < len(self.words):
+            if not self.words[position].startswith(prefix):
+                break
+            found.add(self.word_values[position])
+            position += 1
+        return found
+
+    def search(self, query: str) -> list:
+        """return values matching every word of query, in the order added"""
+        if not self.is_sorted:
+            self._sort()
+        # longest words first; they tend to match the fewest values
+        query_words = sorted(set(get_words(query)), key=len, reverse=True)
+        if not query_words:
+            return list(self.values)
+        found = self._find_prefix(query_words[0])
+        for query_word in query_words[1:]:
+            if not found:
+                break
+            found &= self._find_prefix(query_word)
+        return [self.values[i] for i in sorted(found)]
@@ -0,0 +1,28 @@
+"""the menus, queue and playback position left at exit, restored at launch"""
+import json
+
+import atomic
+
+# bump whenever the layout of a saved session changes
+SESSION_VERSION = 1
+
+
+def load(session_path: str) -> dict:
+    """return the saved session, or an empty dict if there is none or it
+    can't be read"""
+    try:
+        with open(session_path, encoding='utf-8') as session_file:
+            contents = json.load(session_file)
+    except (OSError, ValueError):
+        return dict()
+    if not isinstance(contents, dict):
+        return dict()
+    if contents.get('version') != SESSION_VERSION:
+        return dict()
+    return contents
+
+
+def save(session_path: str, session: dict):
+    """store session as json, to be restored at the next launch"""
+    with atomic.write_file(session_path) as session_file:
+        json.dump(dict(session, version=SESSION_VERSION), session_file)
@@ -0,0 +1,142 @@
+"""per-stage counters and latency histograms for the hot paths.
+
+collection is off unless enabled, and a disabled stage costs one flag check
+per call. stage names are dotted, e.g. 'view.refresh'."""
+import threading
+import functools
+from time import perf_counter, monotonic
+
+# histogram buckets are powers of two microseconds; the last is open ended
+num_buckets = 24
+
+_enabled = False
+_lock = threading.Lock()
+stages = dict()
+# one-off timings in seconds, such as startup's, kept even when disabled
+marks = dict()
+# counts and time at the last call to get_rates
+_rate_counts = dict()
+_rate_time = monotonic()
+
+
+class Stage:
+    """call count, total time, and a latency histogram for one stage"""
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * num_buckets
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = int(seconds * 1000000).bit_length()
+        self.buckets[min(bucket, num_buckets - 1)] += 1
+
+    def get_mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def get_percentile(self, percent: float) -> float:
+        """estimate a percentile in seconds, as its bucket's upper bound"""
+        target = self.count * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min((1 << bucket) / 1000000, self.max)
+        return self.max
+
+
+def mark(name: str, seconds: float):
+    marks[name] = seconds
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        stages.clear()
+        _rate_counts.clear()
+
+
+def record(name: str, seconds: float):
+    if not _enabled:
+        return
+    with _lock:
+        stage = stages.get(name)
+        if stage is None:
+            stage = stages[name] = Stage()
+        stage.add(seconds)
+
+
+def timed(name: str):
+    """decorator recording each call's duration under name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def get_mean_ms(name: str) -> float:
+    with _lock:
+        stage = stages.get(name)
+        return stage.get_mean() * 1000 if stage else 0.0
+
+
+def get_rates() -> dict:
+    """return calls per second of each stage since the last call"""
+    global _rate_time
+    now = monotonic()
+    with _lock:
+        elapsed = max(now - _rate_time, 1e-6)
+        rates = dict()
+        for name, stage in stages.items():
+            rates[name] = (stage.count - _rate_counts.get(name, 0)) / elapsed
+            _rate_counts[name] = stage.count
+        _rate_time = now
+    return rates
+
+
+def get_summary() -> str:
+    """a one line summary for the on-screen overlay"""
+    rates = get_rates()
+    return 'tick %.2fms frame %.2fms tags %d/s ready %.2fs' % (
+        get_mean_ms('controller.tick'), get_mean_ms('view.refresh'),
+        rates.get('tags.read', 0), marks.get('startup.library', 0))
+
+
+def dump(path: str):
+    """write a table of every stage's counts and latencies to path"""
+    header = '%-24s %8s %10s %9s %9s %9s %9s\n' % (
+        'stage', 'count', 'total ms', 'mean ms', 'p50 ms', 'p99 ms', 'max ms')
+    with _lock:
+        lines = list()
+        for name in sorted(stages):
+            stage = stages[name]
+            lines.append('%-24s %8d %10.2f %9.3f %9.3f %9.3f %9.3f\n' % (
+                name, stage.count, stage.total * 1000,
+                stage.get_mean() * 1000, stage.get_percentile(50) * 1000,
+                stage.get_percentile(99) * 1000, stage.max * 1000))
+    for name in sorted(marks):
+        lines.append('%-24s %8s %10.2f\n' % (name, '', marks[name] * 1000))
+    with open(path, 'w') as stats_file:
+        stats_file.write(header)
+        stats_file.writelines(lines)
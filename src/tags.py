@@ -0,0 +1,92 @@
+"""read track tags in a single pass, dispatching on file format"""
+import os
+import sys
+
+import stats
+
+# every record returned by read_tags has these keys, each a list of strings
+TAG_KEYS = ('title', 'artist', 'album', 'year', 'genre', 'tracknumber')
+
+# format specific names for normalized keys, where they differ
+_ID3_KEYS = {'year': 'date'}
+_VORBIS_KEYS = {'year': 'date'}
+
+
+def _read_id3(path: str):
+    # imported on first read; a library loaded from the cache never needs it
+    from mutagen.easyid3 import EasyID3
+    return EasyID3(path), _ID3_KEYS
+
+
+def _read_vorbis(path: str):
+    from mutagen.flac import FLAC  # on first read, as for id3
+    return FLAC(path).tags, _VORBIS_KEYS
+
+
+_readers = {
+    '.mp3': _read_id3,
+    '.flac': _read_vorbis
+}
+
+
+def _normalize(raw_tags, key_map: dict) -> dict:
+    record = dict()
+    for key in TAG_KEYS:
+        values = raw_tags.get(key_map.get(key, key)) if raw_tags else None
+        values = [str(v).strip() for v in values or () if str(v).strip()]
+        record[key] = values
+    # dates may be full timestamps; only the year is indexed
+    record['year'] = [date[:4] for date in record['year']]
+    return record
+
+
+def get_name_tags(path: str) -> dict:
+    """return a record with no tags but the title, set to the file name"""
+    record = _normalize(None, dict())
+    record['title'] = [os.path.splitext(os.path.basename(path))[0]]
+    return record
+
+
+@stats.timed('tags.read')
+def read_tags(path: str) -> dict:
+    """open a track once and return its normalized tags. unreadable or
+    untagged files return empty lists, with the title set to the file name"""
+    from mutagen import MutagenError  # on first read, as for id3
+    ext = os.path.splitext(path)[1].lower()
+    reader = _readers.get(ext)
+    raw_tags = key_map = None
+    if reader is not None:
+        try:
+            raw_tags, key_map = reader(path)
+        except (MutagenError, OSError):
+            pass
+    record = _normalize(raw_tags, key_map or dict())
+    if not record['title']:
+        record['title'] = get_name_tags(path)['title']
+    return record
+
+
+# tuples of tag values shared between tracks, e.g. ('Rock',)
+_shared_values = dict()
+
+
+def intern_packed(packed: tuple) -> tuple:
+    """intern packed values, so an artist shared by a thousand tracks is
+    held in memory once. unpickled or worker made values need reinterning.
+    titles are rarely shared, so only their strings are interned."""
+    interned = list()
+    for key, values in zip(TAG_KEYS, packed):
+        values = tuple(sys.intern(value) for value in values)
+        if key != 'title':
+            values = _shared_values.setdefault(values, values)
+        interned.append(values)
+    return tuple(interned)
+
+
+def pack(record: dict) -> tuple:
+    """store a tag record compactly, as tuples in TAG_KEYS order"""
+    return intern_packed(tuple(record.get(key, ())) for key in TAG_KEYS)
+
+
+def unpack(packed: tuple) -> dict:
+    return {key: list(values) for key, values in zip(TAG_KEYS, packed)}
@@ -0,0 +1,67 @@
+"""a compact table of library tracks, addressed by integer id"""
+from array import array
+from collections.abc import Sequence
+
+from cache import TrackRecord
+from tags import intern_packed
+
+
+def new_posting_list() -> array:
+    """an array of track ids, at four bytes per id"""
+    return array('I')
+
+
+class TrackTable:
+    """every scanned track, each path stored once. columns are indexed by
+    track id; tags are stored packed, as made by tags.pack."""
+
+    def __init__(self):
+        self.paths = list()
+        self.ids = dict()
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.tags = list()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.ids
+
+    def add(self, path: str, record: TrackRecord) -> int:
+        """store a track, returning its id"""
+        track_id = self.ids.get(path)
+        if track_id is not None:
+            return track_id
+        track_id = len(self.paths)
+        self.paths.append(path)
+        self.ids[path] = track_id
+        self.sizes.append(record.size)
+        self.mtimes.append(record.mtime)
+        self.tags.append(intern_packed(record.tags))
+        return track_id
+
+    def get_record(self, track_id: int) -> TrackRecord:
+        return TrackRecord(self.sizes[track_id], self.mtimes[track_id],
+                           self.tags[track_id])
+
+    def get_records(self) -> dict:
+        """return the table as a dict of paths to records, for caching"""
+        return {path: self.get_record(track_id)
+                for track_id, path in enumerate(self.paths)}
+
+
+class PathView(Sequence):
+    """a read-only sequence of the paths of some track ids"""
+
+    def __init__(self, paths: list, track_ids: Sequence):
+        self.paths = paths
+        self.track_ids = track_ids
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.paths[i] for i in self.track_ids[index]]
+        return self.paths[self.track_ids[index]]
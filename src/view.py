@@ -2,9 +2,13 @@
 import os
 import sys
 import curses
+import shutil
 from datetime import timedelta
 import cfg
-from typing import NamedTuple, List
+from search import fold
+import stats
+from collections.abc import Sequence
+from typing import NamedTuple
 from enum import IntEnum
 
 
@@ -19,14 +23,58 @@ class ItemType(IntEnum):
 class DisplayItem(NamedTuple):
     item_type: ItemType
     path: str
+    name: str = None  # shown in place of the path's base name if set
+
+    def get_name(self) -> str:
+        return self.name or os.path.basename(self.path)
+
+
+def get_letter_offsets(items: Sequence) -> dict:
+    """map each folded first letter to the position of the first item whose
+    name starts with it"""
+    offsets = dict()
+    for position, item in enumerate(items):
+        name = fold(item.get_name()[:1])
+        if name and name not in offsets:
+            offsets[name] = position
+    return offsets
+
+
+class LazyItems(Sequence):
+    """a read-only view of paths as display items of one type. items are
+    only made when accessed, so a menu over a huge collection costs no more
+    than the lines on screen."""
+
+    def __init__(self, item_type: ItemType, paths: Sequence,
+                 names: Sequence = None):
+        self.item_type = item_type
+        self.paths = paths
+        self.names = names
+        self.letter_offsets: dict = None
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.paths)))]
+        name = self.names[index] if self.names else None
+        return DisplayItem(self.item_type, self.paths[index], name)
+
+    def get_letter_offsets(self) -> dict:
+        """letter offsets are found once per menu, making each jump O(1)"""
+        if self.letter_offsets is None:
+            self.letter_offsets = get_letter_offsets(self)
+        return self.letter_offsets
 
 
 class Display(NamedTuple):
     """hold all information necessary to draw a display"""
-    items: List[DisplayItem]
+    items: Sequence
     menu_path: str = ''
     index: int = 0  # selected item indexed from screen start
     start_index: int = 0  # position in list to start displayed fields
+    keys: tuple = ()  # the path of browse index keys to a library menu
 
     def get_selected_item(self):
         if len(self.items) > 0:
@@ -48,9 +96,33 @@ class View:
             home_items.append(DisplayItem(ItemType.Menu, item))
         self.menu_stack.append(Display(home_items, ''))
 
+        # lines staged for the next frame, and lines as last written to curses.
+        # both map a line number to a (text, attribute) pair.
+        self.frame = dict()
+        self.drawn = dict()
+        self.drawn_title = None
+        self.metadata = None
+        # a line of debugging stats drawn over the bottom of the menu
+        self.overlay: str = None
+        # album art drawn between the menu and the status area, once enabled
+        self.show_art = False
+        self.art_lines: list = None
+        # a plain list of items, and the letter offsets found in it
+        self.letter_offsets: tuple = None
+        self._layout()
+        self.notify(cfg.no_media_str)
+
+    def _layout(self):
+        """size the window regions to the terminal"""
         self.max_y_chars, self.max_x_chars = self.screen.getmaxyx()
         # 7 from 3 border chars + four status lines
         self.num_menu_lines = self.max_y_chars - 7
+        # art is dropped on terminals too short to keep a usable menu
+        self.art_rows = 0
+        if self.show_art and (self.num_menu_lines - cfg.art_rows
+                              >= cfg.art_min_menu_lines):
+            self.art_rows = cfg.art_rows
+            self.num_menu_lines -= self.art_rows
         # persistant screen locations
         self.y_indicies = {
             'status': self.max_y_chars - 5,
@@ -58,7 +130,7 @@ class View:
             'time': self.max_y_chars - 3,
             'progress_bar': self.max_y_chars - 2
         }
-        self.notify(cfg.no_media_str)
+        self.full_repaint = True
 
     def __del__(self):
         """restore the previous state of the terminal"""
@@ -129,29 +201,20 @@ class View:
         time_str = curr_time_str + cfg.time_sep_str + run_time_str
         return time_str + percent_str
 
-    def _clear_line(self, line: int):
-        self.screen.move(line, 1)
-        self.screen.clrtoeol()
-        self._draw_borders()
+    def _stage_line(self, line: int, text: str, attr: int = curses.A_NORMAL):
+        """set a line's contents for the next frame"""
+        self.frame[line] = (text, attr)
 
-    def _clear_menu_lines(self):
-        for line in list(range(1, self.num_menu_lines + 1)):
-            self._clear_line(line)
-
-    def _clear_status_lines(self):
-        self._clear_line(self.y_indicies['metadata'])
-        self._clear_line(self.y_indicies['time'])
-        self._clear_line(self.y_indicies['progress_bar'])
+    def _get_title(self) -> str:
+        menu_path = self.menu_stack[-1].menu_path
+        if not menu_path:
+            return ' ' + cfg.home_icon + ' '
+        return ' ' + menu_path + ' '
 
     def _draw_borders(self):
         self.screen.border(0)
-        menu_path = self.menu_stack[-1].menu_path
-        if not menu_path:
-            title = ' ' + cfg.home_icon + ' '
-        else:
-            title = ' ' + menu_path + ' '
         #  4 from two boarder characters on each side
-        title = self._truncate_string(title, self.max_x_chars - 4)
+        title = self._truncate_string(self._get_title(), self.max_x_chars - 4)
         title_pos = (self.max_x_chars - len(title)) // 2
         self.screen.addstr(0, title_pos, title)
         #  connecting line tee characters from extended curses set
@@ -168,31 +231,60 @@ class View:
         """denote an empty collection of display items"""
         center_x = (self.max_x_chars - len(cfg.empty_str)) // 2
         center_y = self.num_menu_lines // 2
-        self.screen.addstr(center_y, center_x, cfg.empty_str)
+        self._stage_line(center_y, ' ' * (center_x - 1) + cfg.empty_str)
 
-    def navigate_up(self):
+    def navigate_to(self, position: int):
+        """select the item at position, clamped to the menu. the menu scrolls
+        a full page at a time, so the first line is a multiple of the page"""
         display = self.menu_stack[-1]
-        if display.start_index + display.index > 0:
-            self.menu_stack.pop()
-            index = display.index
-            start_index = display.start_index
-            if display.index > 0:
-                index = display.index - 1
-            elif display.start_index >= self.num_menu_lines:
-                start_index = start_index - self.num_menu_lines
-                index = self.num_menu_lines - 1
-            display = display._replace(index=index, start_index=start_index)
-            self.menu_stack.append(display)
-
-    def navigate_down(self):
+        if display.items is None:
+            # a directory that couldn't be listed
+            return
+        position = max(0, min(position, len(display.items) - 1))
+        start_index = position - position % max(1, self.num_menu_lines)
+        display = display._replace(index=position - start_index,
+                                   start_index=start_index)
+        self.menu_stack.pop()
+        self.menu_stack.append(display)
+
+    def get_position(self) -> int:
         display = self.menu_stack[-1]
-        if display.start_index + display.index < len(display.items) - 1:
-            display = self.menu_stack.pop()
-            display = display._replace(index=display.index + 1)
-            if display.index >= self.num_menu_lines:
-                start_index = display.start_index + self.num_menu_lines
-                display = display._replace(index=0, start_index=start_index)
-            self.menu_stack.append(display)
+        return display.start_index + display.index
+
+    def navigate_up(self, step: int = 1):
+        self.navigate_to(self.get_position() - step)
+
+    def navigate_down(self, step: int = 1):
+        self.navigate_to(self.get_position() + step)
+
+    def page_up(self):
+        self.navigate_up(self.num_menu_lines)
+
+    def page_down(self):
+        self.navigate_down(self.num_menu_lines)
+
+    def navigate_home(self):
+        self.navigate_to(0)
+
+    def navigate_end(self):
+        self.navigate_to(len(self.menu_stack[-1].items) - 1)
+
+    def jump_to_letter(self, letter: str):
+        """select the first item starting with letter, if there is one"""
+        items = self.menu_stack[-1].items
+        if items is None:
+            return
+        if isinstance(items, LazyItems):
+            offsets = items.get_letter_offsets()
+        else:
+            # plain lists can't hold their offsets, so the last menu's are
+            # kept here instead
+            if not self.letter_offsets or self.letter_offsets[0] is not items:
+                self.letter_offsets = (items, get_letter_offsets(items))
+            offsets = self.letter_offsets[1]
+        position = offsets.get(fold(letter))
+        if position is not None:
+            self.navigate_to(position)
 
     def navigate_back(self):
         if len(self.menu_stack) > 1:
@@ -200,27 +292,70 @@ class View:
 
     def notify(self, string: str):
         """add a string to the window; persistant until overwritten"""
-        self._clear_line(self.y_indicies['status'])
-        self.screen.addstr(self.y_indicies['status'], 1, string)
+        self._stage_line(self.y_indicies['status'], string)
+
+    @stats.timed('view.refresh')
+    def refresh(self):
+        """write the staged frame to the terminal. only lines that differ
+        from the last frame are written; the whole screen, borders included,
+        is repainted only after a resize or a change of menu."""
+        # asked of the terminal, as curses only learns of a resize itself
+        # when it reads input, which pynput does instead
+        size = shutil.get_terminal_size((self.max_x_chars, self.max_y_chars))
+        if curses.is_term_resized(size.lines, size.columns):
+            curses.resizeterm(size.lines, size.columns)
+            status = self.frame.get(self.y_indicies['status'])
+            self._layout()
+            self.frame.clear()
+            if status:
+                self._stage_line(self.y_indicies['status'], *status)
+            self.update_status(self.metadata)
+            self.update_menu()
+            self.update_art(self.art_lines)
+        if self.overlay:
+            self._stage_line(self.num_menu_lines, self.overlay,
+                             curses.A_REVERSE)
+        title = self._get_title()
+        if self.full_repaint or title != self.drawn_title:
+            self.screen.erase()
+            self._draw_borders()
+            self.drawn.clear()
+            self.drawn_title = title
+            self.full_repaint = False
 
+        # two border characters
+        width = self.max_x_chars - 2
+        changed = False
+        for line, (text, attr) in self.frame.items():
+            if self.drawn.get(line) == (text, attr):
+                continue
+            self.drawn[line] = (text, attr)
+            text = text[:width]
+            self.screen.addstr(line, 1, text, attr)
+            self.screen.addstr(line, 1 + len(text), ' ' * (width - len(text)))
+            changed = True
+        if changed:
+            self.screen.refresh()
+
+    @stats.timed('view.update_menu')
     def update_menu(self):
-        """draw the top menu on the menu stack"""
-        self._clear_menu_lines()
+        """stage the top menu on the menu stack"""
+        for line in range(1, self.num_menu_lines + 1):
+            self._stage_line(line, '')
         display = self.menu_stack[-1]
 
         if not display.items:
             self.draw_empty_str()
             return
 
-        display_items = display.items[display.start_index:]
+        end_index = display.start_index + self.num_menu_lines
+        display_items = display.items[display.start_index:end_index]
         if len(display_items) <= 0:
             self.draw_empty_str()
             return
 
         for list_index, item in enumerate(display_items, start=1):
-            if list_index > self.num_menu_lines:
-                break
-            item_name = os.path.basename(item.path)
+            item_name = item.get_name()
             item_name = self._truncate_string(item_name, self.max_x_chars - 4)
             if item.item_type is ItemType.Menu:
                 item_name = cfg.menu_icon + item_name
@@ -232,28 +367,54 @@ class View:
                 item_name = cfg.track_icon + item_name
 
             if display.index + 1 == list_index:
-                self.screen.addstr(list_index, 1, item_name, curses.A_REVERSE)
+                self._stage_line(list_index, item_name, curses.A_REVERSE)
+            else:
+                self._stage_line(list_index, item_name)
+
+    def enable_art(self):
+        """make room for album art above the status area"""
+        self.show_art = True
+        self._layout()
+
+    def get_art_size(self) -> tuple:
+        """return the columns and rows of the art area, as a square. rows
+        are 0 while art isn't shown."""
+        # two border characters
+        cols = min(self.art_rows * 2, self.max_x_chars - 2)
+        return cols, self.art_rows
+
+    def update_art(self, lines: list):
+        """stage album art centered in the art area, or blank it for None"""
+        self.art_lines = lines
+        cols = self.get_art_size()[0]
+        margin = ' ' * ((self.max_x_chars - 2 - cols) // 2)
+        for row in range(self.art_rows):
+            line = self.num_menu_lines + 1 + row
+            if lines and row < len(lines):
+                self._stage_line(line, margin + lines[row])
             else:
-                self.screen.addstr(list_index, 1, item_name)
+                self._stage_line(line, '')
 
+    @stats.timed('view.update_status')
     def update_status(self, metadata: dict):
-        """update track metadata and progress indicators."""
+        """stage track metadata and progress indicators."""
 
-        self._clear_status_lines()
+        self.metadata = metadata
         if metadata is None:
-            self.screen.addstr(self.y_indicies['metadata'], 1, cfg.no_load_str)
+            self._stage_line(self.y_indicies['metadata'], cfg.no_load_str)
             run_time = curr_time = 0
         else:
-            title = metadata.get('title')[0]
-            artist = metadata.get('artist')[0]
+            # untagged tracks have empty lists, or no key at all
+            title = (metadata.get('title') or [cfg.unknown_str])[0]
+            artist = (metadata.get('artist') or [cfg.unknown_str])[0]
             run_time = metadata.get('run_time', 0)
             curr_time = metadata.get('curr_time', 0)
             track_info = title + cfg.track_sep_str + artist
-            self.screen.addstr(self.y_indicies['metadata'], 1, track_info)
+            self._stage_line(self.y_indicies['metadata'], track_info)
 
         # two border characters
         width = self.max_x_chars - 2
         progress_bar = self._draw_progress_bar(run_time, curr_time, width)
         time_str = self._draw_time_str(run_time, curr_time)
-        self.screen.addstr(self.y_indicies['time'], 1, time_str)
-        self.screen.addstr(self.y_indicies['progress_bar'], 1, progress_bar)
\ No newline at end of file
+        self._stage_line(self.y_indicies['time'], time_str)
+        self._stage_line(self.y_indicies['progress_bar'], progress_bar)
\ No newline at end of file
@@ -0,0 +1,89 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from mutagen.id3 import ID3, APIC
+
+from src import art
+
+if art.is_available():
+    import numpy
+    from PIL import Image
+
+
+def _png(width: int, height: int, color: int) -> bytes:
+    image = Image.new('L', (width, height), color)
+    data = io.BytesIO()
+    image.save(data, 'PNG')
+    return data.getvalue()
+
+
+@unittest.skipUnless(art.is_available(), 'needs numpy and pillow')
+class TestArtMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_dither_keeps_brightness(self):
+        for level in (0.0, 0.25, 0.5, 0.8, 1.0):
+            pixels = numpy.full((16, 32), level, dtype=numpy.float32)
+            bits = art.dither(pixels)
+            self.assertAlmostEqual(level, bits.mean(), delta=0.05)
+
+    def test_to_blocks(self):
+        bits = numpy.array([[1, 0, 1, 1],
+                            [0, 1, 1, 1],
+                            [0, 0, 0, 1]]).astype(bool)
+        # odd rows are padded with dark pixels
+        self.assertEqual(['▚█', ' ▝'], art.to_blocks(bits))
+
+    def test_embedded_art(self):
+        path = os.path.join(self.temp_dir.name, 'track.mp3')
+        with open(path, 'wb') as mp3:
+            mp3.write(b'\x00' * 128)
+        tags = ID3()
+        tags.add(APIC(type=3, mime='image/png', data=_png(8, 8, 255)))
+        tags.save(path)
+        lines = art.render(path, 4, 2)
+        self.assertEqual(['████', '████'], lines)
+
+    def test_folder_art(self):
+        path = os.path.join(self.temp_dir.name, 'track.mp3')
+        with open(path, 'wb') as mp3:
+            mp3.write(b'\x00' * 128)
+        self.assertIsNone(art.render(path, 4, 2))
+        with open(os.path.join(self.temp_dir.name, 'Cover.jpg'), 'wb') as jpg:
+            jpg.write(_png(8, 8, 0))
+        self.assertEqual(['    ', '    '], art.render(path, 4, 2))
+
+    def test_worker_survives_errors(self):
+        ready = threading.Event()
+        with mock.patch.object(art.ArtCache, '_load',
+                               side_effect=[RuntimeError, ['art']]):
+            cache = art.ArtCache(ready.set)
+            tags = {'album': ['bad']}
+            self.assertIsNone(cache.get('/a/1.mp3', tags, 4, 2))
+            self.assertTrue(ready.wait(1))
+            self.assertEqual([], cache.get('/a/1.mp3', tags, 4, 2))
+            ready.clear()
+            tags = {'album': ['good']}
+            cache.get('/a/1.mp3', tags, 4, 2)
+            self.assertTrue(ready.wait(1))
+            self.assertEqual(['art'], cache.get('/a/1.mp3', tags, 4, 2))
+
+    def test_album_key(self):
+        tags = {'artist': ['band'], 'album': ['record']}
+        self.assertEqual(art.get_album_key('/a/1.mp3', tags),
+                         art.get_album_key('/b/2.mp3', tags))
+        self.assertNotEqual(art.get_album_key('/a/1.mp3', {}),
+                            art.get_album_key('/b/2.mp3', {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from src import atomic
+
+
+class TestAtomicMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'dir', 'file')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_file(self):
+        with atomic.write_file(self.path) as out:
+            out.write('old')
+        with atomic.write_file(self.path, binary=True) as out:
+            out.write(b'new')
+        with open(self.path) as result:
+            self.assertEqual('new', result.read())
+
+    def test_failed_write(self):
+        with atomic.write_file(self.path) as out:
+            out.write('old')
+        with self.assertRaises(ValueError):
+            with atomic.write_file(self.path) as out:
+                out.write('partial')
+                raise ValueError
+        with open(self.path) as result:
+            self.assertEqual('old', result.read())
+        self.assertEqual(['file'], os.listdir(os.path.dirname(self.path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
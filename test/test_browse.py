@@ -0,0 +1,40 @@
+import unittest
+
+from src.browse import BrowseIndex
+
+
+class TestBrowseIndexMethods(unittest.TestCase):
+
+    def test_sorted_levels(self):
+        index = BrowseIndex(('artist', 'album'), dict())
+        index.add(('band 10', 'b'), 0)
+        index.add(('Band 2', 'a'), 1)
+        index.add(('band 10', 'a'), 2)
+        self.assertEqual(['Band 2', 'band 10'], index.get_keys())
+        self.assertEqual(['a', 'b'], index.get_keys(('band 10',)))
+        self.assertEqual([2], list(index.get_tracks(('band 10', 'a'))))
+        self.assertEqual([], index.get_keys(('missing',)))
+
+    def test_sorted_tracks(self):
+        numbers = [3, 1, 2]
+        index = BrowseIndex(('album',), dict(), numbers.__getitem__)
+        for track_id in range(3):
+            index.add(('album',), track_id)
+        self.assertEqual([1, 2, 0], list(index.get_tracks(('album',))))
+
+    def test_changes_resort(self):
+        index = BrowseIndex(('genre',), dict())
+        index.add(('rock',), 0)
+        index.finish()
+        shown = index.get_tracks(('rock',))
+        self.assertIs(shown, index.get_tracks(('rock',)))
+        index.add(('jazz',), 1)
+        index.add(('rock',), 2)
+        self.assertEqual(['jazz', 'rock'], index.get_keys())
+        self.assertEqual([0, 2], list(index.get_tracks(('rock',))))
+        # menus already shown keep what they were given
+        self.assertEqual([0], list(shown))
+
+
+if __name__ == '__main__':
+    unittest.main()
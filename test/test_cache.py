@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+
+from src import cache, tags
+
+
+class TestCacheMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'library_cache')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_load_missing(self):
+        self.assertEqual(dict(), cache.load(self.cache_path, '/music'))
+
+    def test_save_and_load(self):
+        packed = tags.pack({'title': ['t'], 'artist': ['a']})
+        records = {'/music/a.mp3': cache.TrackRecord(10, 20, packed)}
+        cache.save(self.cache_path, '/music', records)
+        self.assertEqual(records, cache.load(self.cache_path, '/music'))
+        # a cache built for another directory is ignored
+        self.assertEqual(dict(), cache.load(self.cache_path, '/other'))
+
+    def test_load_corrupt(self):
+        with open(self.cache_path, 'wb') as cache_file:
+            cache_file.write(b'not a cache')
+        self.assertEqual(dict(), cache.load(self.cache_path, '/music'))
+
+    def test_is_stale(self):
+        path = os.path.join(self.temp_dir.name, 'track.mp3')
+        with open(path, 'wb') as track:
+            track.write(b'1234')
+        stat = os.stat(path)
+        self.assertTrue(cache.is_stale(None, stat))
+        record = cache.TrackRecord(stat.st_size, stat.st_mtime_ns, ())
+        self.assertFalse(cache.is_stale(record, stat))
+        record = cache.TrackRecord(stat.st_size + 1, stat.st_mtime_ns, ())
+        self.assertTrue(cache.is_stale(record, stat))
@@ -1,7 +1,63 @@
+import os
+import signal
+import tempfile
 import unittest
-from src.controller import Controller
+from unittest import mock
+from pynput.keyboard import Key, KeyCode
+from src.controller import Controller, coalesce, cfg
+from src.view import Display
+from test.test_view import HeadlessView
 
 class TestControllerMethods(unittest.TestCase):
 
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        os.mkdir(os.path.join(root, 'music'))
+        self.cfg = mock.patch.multiple(
+            cfg, music_dir=os.path.join(root, 'music'),
+            playlist_dir=os.path.join(root, 'playlists'),
+            library_cache_path=os.path.join(root, 'library_cache'),
+            history_path=os.path.join(root, 'history'),
+            session_path=os.path.join(root, 'session'),
+            show_art=False)
+        self.cfg.start()
+
+    def tearDown(self):
+        self.cfg.stop()
+        self.temp_dir.cleanup()
+
     def test_init(self):
         return
+
+    def test_restore_missing_dir(self):
+        controller = Controller(HeadlessView())
+        # the playlist directory is gone since the session was saved
+        controller.restore_menus([['', 0], ['playlists', 2]])
+        self.assertEqual('playlists', controller.view.menu_stack[-1].menu_path)
+        self.assertIsNone(controller.view.menu_stack[-1].items)
+
+    def test_search_unlisted(self):
+        controller = Controller(HeadlessView())
+        controller.view.menu_stack.append(Display(None, 'playlists'))
+        controller.handle_key(KeyCode.from_char('/'))
+        self.assertIsNone(controller.search_query)
+
+    @unittest.skipUnless(hasattr(signal, 'SIGWINCH'), 'needs SIGWINCH')
+    def test_resize_wakes(self):
+        controller = Controller(HeadlessView())
+        old_handler = controller.handle_resizes()
+        try:
+            controller.wake.clear()
+            os.kill(os.getpid(), signal.SIGWINCH)
+            self.assertTrue(controller.wake.wait(1))
+        finally:
+            signal.signal(signal.SIGWINCH, old_handler)
+
+    def test_coalesce(self):
+        commands = [(Key.down, 1)] * 30 + [(Key.right, 1), (Key.up, 2),
+                                           (Key.up, 3), (Key.down, 1)]
+        self.assertEqual([(Key.down, 30), (Key.right, 1), (Key.up, 5),
+                          (Key.down, 1)], coalesce(commands))
+        # only scrolling keys merge
+        self.assertEqual([(Key.right, 1)] * 2, coalesce([(Key.right, 1)] * 2))
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+from src.history import History
+
+
+class TestHistoryMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.temp_dir.name, 'history')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_bounded(self):
+        history = History(self.log_path, 3)
+        for i in range(5):
+            history.record(str(i))
+        self.assertEqual(['4', '3', '2'], history.get_recent())
+
+    def test_persisted(self):
+        history = History(self.log_path, 3)
+        history.record('a')
+        history.record('b')
+        self.assertEqual(['b', 'a'], History(self.log_path, 3).get_recent())
+
+    def test_compacted(self):
+        history = History(self.log_path, 3)
+        for i in range(10):
+            history.record(str(i))
+        with open(self.log_path) as log_file:
+            lines = log_file.read().splitlines()
+        self.assertLess(len(lines), 6)
+        self.assertEqual(['7', '8', '9'], lines[-3:])
+        self.assertEqual(['9', '8', '7'], History(self.log_path, 3).get_recent())
+
+
+if __name__ == '__main__':
+    unittest.main()
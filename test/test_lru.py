@@ -0,0 +1,22 @@
+import unittest
+
+from src.lru import LRUCache
+
+
+class TestLRUCacheMethods(unittest.TestCase):
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)  # 'b' is now least recently used
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(2, len(cache))
+
+    def test_get_default(self):
+        cache = LRUCache(1)
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual(0, cache.get('missing', 0))
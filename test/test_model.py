@@ -0,0 +1,274 @@
+import os
+import random
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src import model
+from src.model import TrackQueue, Player, Library, RepeatMode
+from src.lru import LRUCache
+from bench import stubs
+
+
+class TestTrackQueueMethods(unittest.TestCase):
+
+    def test_shuffle_plays_each_once(self):
+        random.seed(0)
+        queue = TrackQueue()
+        paths = [str(i) for i in range(100)]
+        queue.extend(paths)
+        queue.set_shuffled(True)
+        played = [queue.popleft() for _ in range(len(paths))]
+        self.assertEqual(sorted(paths), sorted(played))
+        self.assertNotEqual(paths, played)
+
+    def test_peek_is_next(self):
+        queue = TrackQueue()
+        queue.extend([str(i) for i in range(100)])
+        queue.set_shuffled(True)
+        for _ in range(10):
+            up_next = queue.peek()
+            self.assertEqual(up_next, queue.peek())
+            self.assertEqual(up_next, queue.popleft())
+
+    def test_queued_next_is_kept(self):
+        queue = TrackQueue()
+        queue.extend([str(i) for i in range(100)])
+        queue.set_shuffled(True)
+        queue.appendleft('chosen')
+        self.assertEqual('chosen', queue.popleft())
+
+    def test_remove(self):
+        queue = TrackQueue()
+        queue.extend(['a', 'b', 'c'])
+        version = queue.version
+        queue.remove(1)
+        self.assertEqual(['a', 'c'], list(queue.tracks))
+        self.assertGreater(queue.version, version)
+        # indexes gone stale since the queue changed are ignored
+        version = queue.version
+        queue.remove(2)
+        queue.remove(-1)
+        self.assertEqual(['a', 'c'], list(queue.tracks))
+        self.assertEqual(version, queue.version)
+
+    def test_move(self):
+        queue = TrackQueue()
+        queue.extend(['a', 'b', 'c'])
+        version = queue.version
+        queue.move(2, 0)
+        self.assertEqual(['c', 'a', 'b'], list(queue.tracks))
+        self.assertGreater(queue.version, version)
+        # moved past the end, it's clamped to the last place
+        queue.move(0, 10)
+        self.assertEqual(['a', 'b', 'c'], list(queue.tracks))
+        version = queue.version
+        queue.move(1, 1)
+        queue.move(3, 0)
+        self.assertEqual(['a', 'b', 'c'], list(queue.tracks))
+        self.assertEqual(version, queue.version)
+
+    def test_clear(self):
+        queue = TrackQueue()
+        queue.extend(['a', 'b'])
+        version = queue.version
+        queue.clear()
+        self.assertEqual(0, len(queue))
+        self.assertGreater(queue.version, version)
+
+
+class TestPlayerMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(model, 'vlc', stubs.make_vlc()),
+            mock.patch.object(model.cfg, 'history_path',
+                              os.path.join(self.temp_dir.name, 'history'))]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.temp_dir.cleanup()
+
+    def _loaded_player(self, paths: list) -> Player:
+        player = Player(Library())
+        player.load()
+        player.queue_last(paths)
+        player.play_next_track()
+        return player
+
+    @staticmethod
+    def _fire(player: Player, event_type):
+        for callback in player.media_player.events.callbacks[event_type]:
+            callback(None)
+
+    def test_advance(self):
+        player = self._loaded_player(['a', 'b'])
+        self.assertFalse(player.advance())
+        self._fire(player, model.vlc.EventType.MediaPlayerEndReached)
+        self.assertTrue(player.advance())
+        self.assertEqual('b', player.curr_track_path)
+
+    def test_repeat_one(self):
+        player = self._loaded_player(['a', 'b'])
+        player.set_repeat(RepeatMode.ONE)
+        self._fire(player, model.vlc.EventType.MediaPlayerEndReached)
+        self.assertTrue(player.advance())
+        self.assertEqual('a', player.curr_track_path)
+        self.assertEqual(1, player.curr_track.is_playing())
+        # a track that can't be played isn't retried forever
+        self._fire(player, model.vlc.EventType.MediaPlayerEncounteredError)
+        self.assertTrue(player.advance())
+        self.assertEqual('b', player.curr_track_path)
+        self.assertNotIn('a', player.media_cache)
+
+    def test_media_reused(self):
+        player = self._loaded_player(['a', 'b'])
+        # the next track was parsed while this one played
+        prebuffered = player.media_cache.get('b')
+        self.assertIsNotNone(prebuffered)
+        player.play_next_track()
+        self.assertIs(prebuffered, player.media_player.get_media())
+        self.assertIs(player._get_media('a'), player._get_media('a'))
+
+    def test_failed_load(self):
+        player = Player(Library())
+        with mock.patch.object(model, '_import_vlc', side_effect=ImportError):
+            player.load()
+        self.assertTrue(player.failed)
+        # nothing is left waiting on VLC
+        done = threading.Event()
+
+        def play():
+            player.queue_last('track.mp3')
+            self.assertFalse(player.play_next_track())
+            player.skip_forward()
+            done.set()
+        threading.Thread(target=play, daemon=True).start()
+        self.assertTrue(done.wait(1))
+
+    def test_repeat_all(self):
+        player = Player(Library())
+        player.queue_last(['a', 'b'])
+        self.assertEqual('a', player._pop_next())
+        # tracks are only kept for another pass while repeating all
+        self.assertEqual([], player.cycle)
+        player.curr_track_path = 'a'
+        player.set_repeat(RepeatMode.ALL)
+        self.assertEqual('b', player._pop_next())
+        self.assertEqual('a', player._pop_next())
+        self.assertEqual('b', player._pop_next())
+        player.set_repeat(RepeatMode.ONE)
+        self.assertEqual([], player.cycle)
+        self.assertIsNone(player._pop_next())
+
+
+class TestLibraryMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for name in ('disc 10', 'disc 2'):
+            os.mkdir(os.path.join(self.root, name))
+        for name in ('track 10.mp3', 'track 9.flac', 'notes.txt', 'a.m3u'):
+            with open(os.path.join(self.root, name), 'wb'):
+                pass
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _touch_dir(self, seconds: int):
+        # set explicitly, in case the filesystem's clock is too coarse to
+        # see the change
+        os.utime(self.root, ns=(seconds * 10 ** 9, seconds * 10 ** 9))
+
+    def test_disk_items_order(self):
+        items = Library().get_disk_items(self.root)
+        names = [os.path.basename(item.path) for item in items]
+        self.assertEqual(['disc 2', 'disc 10', 'a.m3u', 'track 9.flac',
+                          'track 10.mp3'], names)
+
+    def test_disk_items_cached(self):
+        library = Library()
+        self._touch_dir(1)
+        items = library.get_disk_items(self.root)
+        self.assertIs(items, library.get_disk_items(self.root))
+        # a new file changes the directory's mtime, and so the listing
+        with open(os.path.join(self.root, 'track 1.mp3'), 'wb'):
+            pass
+        self._touch_dir(2)
+        new_items = library.get_disk_items(self.root)
+        self.assertIsNot(items, new_items)
+        self.assertEqual(len(items) + 1, len(new_items))
+
+    def test_disk_items_bounded(self):
+        library = Library()
+        library.dir_cache = LRUCache(2)
+        dirs = [self.root] + [os.path.join(self.root, name)
+                              for name in ('disc 2', 'disc 10')]
+        listings = [library.get_disk_items(path) for path in dirs]
+        self.assertEqual(2, len(library.dir_cache))
+        # the oldest listing was evicted, and is listed again
+        self.assertIsNot(listings[0], library.get_disk_items(self.root))
+        self.assertIs(listings[2], library.get_disk_items(dirs[2]))
+
+    def _scan(self) -> Library:
+        library = Library()
+        with mock.patch.multiple(
+                model.cfg, music_dir=self.root, scan_use_processes=False,
+                library_cache_path=os.path.join(self.root, 'cache')):
+            library.scan()
+        return library
+
+    def test_rescan(self):
+        with mock.patch.object(model, 'read_tags',
+                               wraps=model.read_tags) as read_tags:
+            self.assertEqual(2, len(self._scan().tracks))
+            self.assertEqual(2, read_tags.call_count)
+            # unchanged tracks come from the cache
+            read_tags.reset_mock()
+            self._scan()
+            read_tags.assert_not_called()
+            changed = os.path.join(self.root, 'track 10.mp3')
+            with open(changed, 'wb') as track:
+                track.write(b'changed')
+            os.remove(os.path.join(self.root, 'track 9.flac'))
+            library = self._scan()
+        read_tags.assert_called_once_with(changed)
+        self.assertEqual([changed], list(library.tracks.paths))
+
+    def test_scan_unreadable(self):
+        unreadable = os.path.join(self.root, 'track 10.mp3')
+
+        def read_tags(path):
+            if path == unreadable:
+                raise RuntimeError('unexpected')
+            return model.read_tags(path)
+        with mock.patch.object(model, 'read_tags', read_tags):
+            library = self._scan()
+        self.assertEqual(2, len(library.tracks))
+        self.assertEqual(['track 10'],
+                         library.get_track_tags(unreadable)['title'])
+
+    def test_search_sorted(self):
+        library = Library()
+        for track_id, artist in enumerate(('band wire', 'Band 10', 'band 2')):
+            tags = model.pack({'title': ['t'], 'artist': [artist]})
+            record = model.cache.TrackRecord(0, 0, tags)
+            library.add_track(str(track_id), record)
+        # in the artists menu's order, not the order scanned
+        self.assertEqual(['band 2', 'Band 10', 'band wire'],
+                         library.search('artist', 'band'))
+
+    def test_scan_broken_link(self):
+        os.symlink(os.path.join(self.root, 'missing.mp3'),
+                   os.path.join(self.root, 'link.mp3'))
+        self.assertEqual(2, len(self._scan().tracks))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from src import playlist
+
+
+class TestPlaylistMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.playlist_path = os.path.join(self.temp_dir.name, 'mix.m3u8')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, text: str):
+        with open(self.playlist_path, 'w', encoding='utf-8') as m3u:
+            m3u.write(text)
+
+    def test_parse(self):
+        self._write('#EXTM3U\n'
+                    '#EXTINF:215,Sigur Rós - Hoppípolla\n'
+                    'music/hoppipolla.flac\n'
+                    '\n'
+                    '# a comment\n'
+                    '/abs/track.mp3\n')
+        entries = playlist.parse(self.playlist_path)
+        self.assertEqual(2, len(entries))
+        expected_path = os.path.join(self.temp_dir.name, 'music',
+                                     'hoppipolla.flac')
+        self.assertEqual(expected_path, entries[0].path)
+        self.assertEqual('Sigur Rós - Hoppípolla', entries[0].title)
+        self.assertEqual(215, entries[0].duration)
+        self.assertEqual('/abs/track.mp3', entries[1].path)
+        self.assertIsNone(entries[1].title)
+        self.assertEqual(-1, entries[1].duration)
+
+    def test_file_url(self):
+        self._write('file:///music/My%20Song%20%C3%A9.mp3\n')
+        entries = playlist.parse(self.playlist_path)
+        self.assertEqual('/music/My Song é.mp3', entries[0].path)
+
+    def test_legacy_encoding(self):
+        path = os.path.join(self.temp_dir.name, 'old.m3u')
+        with open(path, 'wb') as m3u:
+            m3u.write('Café.mp3\n'.encode('latin-1'))
+        entries = playlist.parse(path)
+        self.assertEqual('Café.mp3', os.path.basename(entries[0].path))
+
+    def test_get_entries_cached(self):
+        self._write('a.mp3\n')
+        first = playlist.get_entries(self.playlist_path)
+        self.assertIs(first, playlist.get_entries(self.playlist_path))
+        self._write('a.mp3\nb.mp3\n')
+        stat = os.stat(self.playlist_path)
+        # make sure the rewrite is seen as a change on coarse clocks
+        os.utime(self.playlist_path, ns=(stat.st_atime_ns,
+                                         stat.st_mtime_ns + 1000000))
+        self.assertEqual(2, len(playlist.get_entries(self.playlist_path)))
@@ -0,0 +1,37 @@
+import unittest
+
+from src.search import fold, filter_items, natural_key, SearchIndex
+from src.view import DisplayItem, ItemType
+
+
+class TestSearchMethods(unittest.TestCase):
+
+    def test_fold(self):
+        self.assertEqual("bjork", fold("Björk"))
+        self.assertEqual("sigur ros", fold("SIGUR RÓS"))
+        self.assertEqual("strasse", fold("Straße"))
+
+    def test_natural_key(self):
+        names = ["Track 10", "track 2", "Track 1", "album", "10 songs"]
+        expected = ["10 songs", "album", "Track 1", "track 2", "Track 10"]
+        self.assertEqual(expected, sorted(names, key=natural_key))
+
+    def test_search_index(self):
+        index = SearchIndex()
+        index.add('a', "The Beatles")
+        index.add('b', "Beach House")
+        index.add('c', "Björk")
+        self.assertEqual(['a', 'b'], index.search("be"))
+        self.assertEqual(['b'], index.search("hou bea"))
+        self.assertEqual(['c'], index.search("BJO"))
+        self.assertEqual([], index.search("beatles house"))
+        self.assertEqual(['a', 'b', 'c'], index.search(""))
+        # names added after a search are found by the next one
+        index.add('d', "Bee Gees")
+        self.assertEqual(['a', 'b', 'd'], index.search("be"))
+
+    def test_filter_items(self):
+        items = [DisplayItem(ItemType.Track, "/music/Café del Mar.mp3"),
+                 DisplayItem(ItemType.Track, "/music/cafe/Other.mp3")]
+        self.assertEqual(items[:1], filter_items(items, "cafe"))
+        self.assertEqual(items, filter_items(items, ""))
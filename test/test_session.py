@@ -0,0 +1,37 @@
+import os
+import json
+import tempfile
+import unittest
+
+from src import session
+
+
+class TestSessionMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.session_path = os.path.join(self.temp_dir.name, 'session')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        saved = {'menus': [['', 1], ['albums', 3]], 'queue': ['a.mp3'],
+                 'track': 'b.mp3', 'time': 12.5}
+        session.save(self.session_path, saved)
+        loaded = session.load(self.session_path)
+        for key, value in saved.items():
+            self.assertEqual(value, loaded[key])
+
+    def test_missing_or_outdated(self):
+        self.assertEqual({}, session.load(self.session_path))
+        with open(self.session_path, 'w') as session_file:
+            json.dump({'version': -1, 'queue': ['a.mp3']}, session_file)
+        self.assertEqual({}, session.load(self.session_path))
+        with open(self.session_path, 'w') as session_file:
+            session_file.write('{not json')
+        self.assertEqual({}, session.load(self.session_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from src import stats
+
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        stats.reset()
+
+    def tearDown(self):
+        stats.enable(False)
+        stats.reset()
+
+    def test_disabled_records_nothing(self):
+        stats.enable(False)
+        timed = stats.timed('test.stage')(lambda x: x * 2)
+        self.assertEqual(4, timed(2))
+        self.assertEqual({}, stats.stages)
+
+    def test_timed_records_calls(self):
+        stats.enable()
+        timed = stats.timed('test.stage')(lambda x: x * 2)
+        for i in range(10):
+            timed(i)
+        stage = stats.stages['test.stage']
+        self.assertEqual(10, stage.count)
+        self.assertLessEqual(stage.get_percentile(50), stage.max)
+
+    def test_percentile(self):
+        stage = stats.Stage()
+        for _ in range(99):
+            stage.add(0.000001)
+        stage.add(0.5)
+        # one microsecond falls in the bucket bounded by two
+        self.assertEqual(0.000002, stage.get_percentile(50))
+        self.assertEqual(0.5, stage.get_percentile(100))
+
+    def test_dump(self):
+        stats.enable()
+        stats.record('test.stage', 0.001)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stats.txt')
+            stats.dump(path)
+            with open(path) as stats_file:
+                lines = stats_file.readlines()
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[1].startswith('test.stage'))
+
+
+if __name__ == '__main__':
+    unittest.main()
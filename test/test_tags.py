@@ -0,0 +1,64 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from mutagen.easyid3 import EasyID3
+from mutagen.flac import FLAC
+
+from src.tags import read_tags, TAG_KEYS
+
+
+def _write_flac(path: str):
+    """write a bare flac stream header: 44.1kHz, 2 channels, 16 bit"""
+    stream_info = struct.pack('>HH', 4096, 4096) + b'\x00' * 6
+    stream_info += (44100 << 44 | 1 << 41 | 15 << 36).to_bytes(8, 'big')
+    stream_info += b'\x00' * 16
+    with open(path, 'wb') as flac:
+        flac.write(b'fLaC' + bytes([0x80, 0, 0, len(stream_info)]))
+        flac.write(stream_info)
+
+
+class TestTagMethods(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_id3(self):
+        path = os.path.join(self.temp_dir.name, 'track.mp3')
+        with open(path, 'wb') as mp3:
+            mp3.write(b'\x00' * 128)
+        tags = EasyID3()
+        tags['title'] = 'song'
+        tags['artist'] = 'band'
+        tags['date'] = '1999-01-02'
+        tags.save(path)
+        record = read_tags(path)
+        self.assertEqual(['song'], record['title'])
+        self.assertEqual(['band'], record['artist'])
+        self.assertEqual(['1999'], record['year'])
+        self.assertEqual([], record['genre'])
+
+    def test_read_vorbis(self):
+        path = os.path.join(self.temp_dir.name, 'track.flac')
+        _write_flac(path)
+        flac = FLAC(path)
+        flac.add_tags()
+        flac.tags['ALBUM'] = 'record'
+        flac.tags['GENRE'] = ['rock', 'pop']
+        flac.save()
+        record = read_tags(path)
+        self.assertEqual(['record'], record['album'])
+        self.assertEqual(['rock', 'pop'], record['genre'])
+
+    def test_read_untagged(self):
+        path = os.path.join(self.temp_dir.name, 'untagged.mp3')
+        with open(path, 'wb') as mp3:
+            mp3.write(b'\x00' * 128)
+        record = read_tags(path)
+        self.assertEqual(set(TAG_KEYS), set(record))
+        self.assertEqual(['untagged'], record['title'])
+        self.assertEqual([], record['artist'])
@@ -0,0 +1,28 @@
+import unittest
+
+from src.cache import TrackRecord
+from src.tags import pack, unpack
+from src.tracks import TrackTable, PathView
+
+
+class TestTrackTableMethods(unittest.TestCase):
+
+    def test_add(self):
+        table = TrackTable()
+        tags = pack({'title': ['one'], 'artist': ['band']})
+        first = table.add('/music/one.mp3', TrackRecord(1, 2, tags))
+        second = table.add('/music/two.mp3', TrackRecord(3, 4, tags))
+        self.assertEqual((0, 1), (first, second))
+        # adding a path again returns its existing id
+        self.assertEqual(0, table.add('/music/one.mp3', TrackRecord(1, 2, tags)))
+        self.assertEqual(2, len(table))
+        self.assertEqual(TrackRecord(3, 4, tags), table.get_record(1))
+        self.assertEqual(['band'], unpack(table.tags[1])['artist'])
+        self.assertEqual([], unpack(table.tags[1])['genre'])
+
+    def test_path_view(self):
+        paths = ['a', 'b', 'c']
+        view = PathView(paths, [2, 0])
+        self.assertEqual(2, len(view))
+        self.assertEqual('c', view[0])
+        self.assertEqual(['a'], view[1:])
@@ -1,8 +1,40 @@
 import datetime
 import unittest
 import typing
+from unittest import mock
 
-from src.view import View, Display, DisplayItem, ItemType
+from src import cfg
+from src.view import View, Display, DisplayItem, ItemType, LazyItems
+
+
+class FakeScreen:
+    """records curses calls instead of drawing them"""
+
+    def __init__(self, max_y: int, max_x: int):
+        self.max_yx = (max_y, max_x)
+        self.calls = []
+
+    def getmaxyx(self):
+        return self.max_yx
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+
+class HeadlessView(View):
+    """a real view drawn to a fake screen, skipping terminal setup"""
+
+    def __init__(self, items: list = None):
+        """items replace the home menu, if given"""
+        screen = FakeScreen(20, 40)
+        with mock.patch('curses.initscr', return_value=screen), \
+                mock.patch('curses.curs_set'):
+            super().__init__()
+        if items is not None:
+            self.menu_stack = [Display(items, 'menu')]
+
+    def __del__(self):
+        return
 
 
 class TestViewMethods(unittest.TestCase):
@@ -49,4 +81,84 @@ class TestViewMethods(unittest.TestCase):
         returned_str = View._draw_progress_bar(10, 10, 10)
         self.assertEqual(expected_str, returned_str)
         returned_str = View._draw_progress_bar(5, 10, 10)
-        self.assertEqual(expected_str, returned_str)
\ No newline at end of file
+        self.assertEqual(expected_str, returned_str)
+
+    @mock.patch('curses.is_term_resized', return_value=False)
+    def test_refresh_changed_lines(self, _):
+        items = [DisplayItem(ItemType.Track, str(i)) for i in range(5)]
+        view = HeadlessView(items)
+        with mock.patch.object(view, '_draw_borders'):
+            view.update_menu()
+            view.refresh()
+            # an unchanged frame writes nothing
+            view.screen.calls.clear()
+            view.update_menu()
+            view.refresh()
+            self.assertEqual([], view.screen.calls)
+            # moving the cursor rewrites only the two affected lines
+            view.navigate_down()
+            view.update_menu()
+            view.refresh()
+        lines = {args[0] for name, args in view.screen.calls
+                 if name == 'addstr'}
+        self.assertEqual({1, 2}, lines)
+
+    def test_update_status_untagged(self):
+        view = HeadlessView([])
+        view.update_status({'title': ['song'], 'artist': [], 'album': [],
+                            'curr_time': 0, 'run_time': 0})
+        line = view.frame[view.y_indicies['metadata']][0]
+        self.assertEqual('song' + cfg.track_sep_str + cfg.unknown_str, line)
+
+    def test_lazy_items(self):
+        items = LazyItems(ItemType.Track, ['a', 'b', 'c'])
+        self.assertEqual(3, len(items))
+        self.assertEqual(DisplayItem(ItemType.Track, 'b'), items[1])
+        self.assertEqual(DisplayItem(ItemType.Track, 'c'), items[-1])
+        expected = [DisplayItem(ItemType.Track, 'b'),
+                    DisplayItem(ItemType.Track, 'c')]
+        self.assertEqual(expected, items[1:10])
+        display = Display(items, 'tracks', index=1, start_index=1)
+        self.assertEqual(DisplayItem(ItemType.Track, 'c'),
+                         display.get_selected_item())
+        empty = Display(LazyItems(ItemType.Track, []))
+        self.assertIsNone(empty.get_selected_item())
+
+    def test_navigation(self):
+        names = ['apple', 'banana', 'Cherry', 'cranberry', 'date'] * 10
+        view = HeadlessView(LazyItems(ItemType.Track, sorted(names, key=str.lower)))
+        page = view.num_menu_lines
+        view.navigate_down(3)
+        self.assertEqual(3, view.get_position())
+        view.page_down()
+        self.assertEqual(3 + page, view.get_position())
+        self.assertEqual(page, view.menu_stack[-1].start_index)
+        view.navigate_up(100)
+        self.assertEqual(0, view.get_position())
+        view.navigate_end()
+        self.assertEqual(len(names) - 1, view.get_position())
+        view.navigate_home()
+        self.assertEqual(0, view.get_position())
+        view.jump_to_letter('c')
+        self.assertEqual('Cherry', view.menu_stack[-1].get_selected_item().path)
+        view.jump_to_letter('z')  # no match leaves the selection alone
+        self.assertEqual('Cherry', view.menu_stack[-1].get_selected_item().path)
+
+    def test_navigate_unlisted(self):
+        view = HeadlessView()
+        # a directory that couldn't be listed has no items at all
+        view.menu_stack.append(Display(None, 'playlists'))
+        view.navigate_to(2)
+        self.assertEqual(0, view.get_position())
+        view.jump_to_letter('a')
+        self.assertEqual(0, view.get_position())
+
+    @mock.patch('src.view.get_letter_offsets', return_value={'b': 1})
+    def test_jump_plain_list(self, get_offsets):
+        items = [DisplayItem(ItemType.Track, name) for name in ('a', 'b')]
+        view = HeadlessView(items)
+        view.jump_to_letter('b')
+        view.jump_to_letter('b')
+        self.assertEqual(1, view.get_position())
+        # found once per menu
+        self.assertEqual(1, get_offsets.call_count)